@@ -0,0 +1,36 @@
+"""
+Benchmark for the T3Player's move ordering heuristics: solves the same board
+state with and without move ordering and reports how many nodes each search
+visited, and how long it took.
+"""
+from t3_state import *
+from t3_action import *
+from t3_player import *
+import time
+
+# The board state both searches are run from; the empty board is the most
+# expensive state to solve (and beware that the unordered search will take
+# several minutes on it)
+START_STATE = [
+    [0, 0, 0],
+    [0, 0, 0],
+    [0, 0, 0]
+]
+
+# Whether or not odds places the next number on the board
+ODDS_TURN = True
+
+if __name__ == '__main__':
+    results: dict[bool, tuple[Optional["T3Action"], int]] = {}
+    for ordered in [True, False]:
+        context = SearchContext(ordered)
+        start = time.perf_counter()
+        action = choose(T3State(ODDS_TURN, START_STATE), context)
+        elapsed = time.perf_counter() - start
+        results[ordered] = (action, context.nodes)
+        print(("[Ordered]   " if ordered else "[Unordered] ") + str(action) + " | nodes: " + str(context.nodes) +
+              " | " + "{:.2f}".format(elapsed) + "s | " + "{:.0f}".format(context.nodes / elapsed) + " nodes/s")
+
+    if not results[True][0] == results[False][0]:
+        print("[X] Move ordering changed the chosen action!")
+    print("[!] Nodes visited reduced by " + "{:.1f}".format(results[False][1] / results[True][1]) + "x")
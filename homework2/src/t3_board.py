@@ -0,0 +1,194 @@
+"""
+Name: Cameron Scolari
+File for T3Board Class.
+"""
+
+from typing import *
+from t3_action import *
+from t3_state import *
+
+
+class T3Board:
+    """
+    Mutable board used internally by the T3Player's search, on which actions are
+    made and unmade in place rather than copied into new T3States. The sums and
+    open tile counts of every row, column, and diagonal are kept up to date as
+    actions are made, so that wins are detected without rescanning the board.
+
+    Tiles are indexed by cell = row * size + col, and actions by the move code
+    cell * MOVE_SPAN + move, so that the search can work entirely in ints.
+    """
+
+    # The number of move codes reserved for each cell
+    MOVE_SPAN = T3State.MAX_MOVE + 1
+
+    def __init__(self, state: "T3State"):
+        """
+        Constructs a new T3Board holding the same tiles and turn as the given state.
+
+        Parameters:
+            state (T3State):
+                The board state to copy into this board
+        """
+        size: int = state._rows
+        self.size: int = size
+        self.cells: list[int] = [state._state[r][c] for r in range(size) for c in range(size)]
+        self.odd_turn: bool = state._odd_turn
+
+        # Lines are numbered rows first, then columns, then the two diagonals
+        self.cell_lines: list[tuple[int, ...]] = []
+        for r in range(size):
+            for c in range(size):
+                lines: list[int] = [r, size + c]
+                if r == c:
+                    lines.append(2 * size)
+                if r == size - 1 - c:
+                    lines.append(2 * size + 1)
+                self.cell_lines.append(tuple(lines))
+        self.line_sums: list[int] = [0] * (2 * size + 2)
+        self.line_open: list[int] = [0] * (2 * size + 2)
+        for cell, value in enumerate(self.cells):
+            for line in self.cell_lines[cell]:
+                self.line_sums[line] += value
+                if value == 0:
+                    self.line_open[line] += 1
+        self.wins: int = self.line_sums.count(T3State.WIN_TARGET)
+        self.open: int = self.cells.count(0)
+
+        # Cells in the T3Action tiebreaking order: by column, then row
+        self.tile_order: list[int] = [r * size + c for c in range(size) for r in range(size)]
+        self.odd_moves: list[int] = [m for m in range(1, T3State.MAX_MOVE + 1) if m % 2 == 1]
+        self.even_moves: list[int] = [m for m in range(1, T3State.MAX_MOVE + 1) if m % 2 == 0]
+        self.actions: list[T3Action] = [T3Action(cell % size, cell // size, move)
+                                        for cell in range(size * size) for move in range(T3Board.MOVE_SPAN)]
+
+    def moves(self) -> list[int]:
+        """
+        Returns:
+            list[int]:
+                The moves available to the player whose turn it is, in ascending order.
+        """
+        return self.odd_moves if self.odd_turn else self.even_moves
+
+    def codes(self) -> list[int]:
+        """
+        Returns:
+            list[int]:
+                The move codes of every action available on this board, in the
+                T3Action tiebreaking order.
+        """
+        span: int = T3Board.MOVE_SPAN
+        moves: list[int] = self.moves()
+        cells: list[int] = self.cells
+        return [cell * span + move for cell in self.tile_order if cells[cell] == 0 for move in moves]
+
+    def action(self, code: int) -> "T3Action":
+        """
+        Returns:
+            T3Action:
+                The (preallocated) T3Action of the given move code.
+        """
+        return self.actions[code]
+
+    def code(self, action: "T3Action") -> int:
+        """
+        Returns:
+            int:
+                The move code of the given T3Action.
+        """
+        return (action.row() * self.size + action.col()) * T3Board.MOVE_SPAN + action.move()
+
+    def make(self, code: int) -> None:
+        """
+        Places the move of the given move code on the board and passes the turn.
+
+        Parameters:
+            code (int):
+                The move code of an action that is valid on this board.
+        """
+        cell: int = code // T3Board.MOVE_SPAN
+        move: int = code % T3Board.MOVE_SPAN
+        self.cells[cell] = move
+        for line in self.cell_lines[cell]:
+            if self.line_sums[line] == T3State.WIN_TARGET:
+                self.wins -= 1
+            self.line_sums[line] += move
+            self.line_open[line] -= 1
+            if self.line_sums[line] == T3State.WIN_TARGET:
+                self.wins += 1
+        self.open -= 1
+        self.odd_turn = not self.odd_turn
+
+    def unmake(self, code: int) -> None:
+        """
+        Takes back the move of the given move code, which must have been the last
+        one made on this board, and passes the turn back.
+
+        Parameters:
+            code (int):
+                The move code of the last action made on this board.
+        """
+        cell: int = code // T3Board.MOVE_SPAN
+        move: int = code % T3Board.MOVE_SPAN
+        self.cells[cell] = 0
+        for line in self.cell_lines[cell]:
+            if self.line_sums[line] == T3State.WIN_TARGET:
+                self.wins -= 1
+            self.line_sums[line] -= move
+            self.line_open[line] += 1
+            if self.line_sums[line] == T3State.WIN_TARGET:
+                self.wins += 1
+        self.open += 1
+        self.odd_turn = not self.odd_turn
+
+    def wins_with(self, code: int) -> bool:
+        """
+        Returns whether or not making the move of the given move code would complete a
+        line summing to WIN_TARGET, without making it.
+
+        Parameters:
+            code (int):
+                The move code of an action that is valid on this board.
+
+        Returns:
+            bool:
+                Whether or not the move wins on the spot.
+        """
+        move: int = code % T3Board.MOVE_SPAN
+        for line in self.cell_lines[code // T3Board.MOVE_SPAN]:
+            if self.line_sums[line] + move == T3State.WIN_TARGET:
+                return True
+        return False
+
+    def is_win(self) -> bool:
+        """
+        Returns:
+            bool:
+                Whether or not a row, column, or diagonal sums to WIN_TARGET.
+        """
+        return self.wins > 0
+
+    def is_tie(self) -> bool:
+        """
+        Returns:
+            bool:
+                Whether or not the board is full without being a win.
+        """
+        return self.wins == 0 and self.open == 0
+
+    def key(self) -> tuple[int, ...]:
+        """
+        Returns:
+            tuple[int, ...]:
+                A hashable snapshot of the tiles and turn of this board.
+        """
+        return tuple(self.cells) + (self.odd_turn,)
+
+    def to_state(self) -> "T3State":
+        """
+        Returns:
+            T3State:
+                A new T3State holding the same tiles and turn as this board.
+        """
+        size: int = self.size
+        return T3State(self.odd_turn, [self.cells[r * size: (r + 1) * size] for r in range(size)])
@@ -18,6 +18,9 @@ START_STATE = [
 ODDS_STARTS = True
 # Whether or not the human player plays as odds
 PLAYER_ODDS = True
+# The number of milliseconds the AI may think per move; leave as None for it to
+# search the whole game tree, though a budget is needed on boards past 3x3
+TIME_BUDGET_MS: Optional[int] = None
 
 if __name__ == '__main__':
     """
@@ -55,7 +58,7 @@ if __name__ == '__main__':
         # Agent's turn
         else:
             print("\n[...] AI is thinking...")
-            act = choose(state)
+            act = choose(state, time_budget_ms=TIME_BUDGET_MS)
             print("[Opponent's Turn] > " + str(act))
         
         state = state.get_next_state(act)
@@ -0,0 +1,215 @@
+"""
+Name: Cameron Scolari
+Alternative Artificial Intelligence for playing the game of T3 on boards too large
+for the exhaustive alpha-beta search of t3_player to answer quickly.
+Implements Monte Carlo Tree Search with the UCT selection policy.
+"""
+from typing import *
+from t3_state import *
+from t3_board import *
+import math
+import random
+import time
+
+# The default number of iterations searched per move when neither an iteration
+# nor time budget is given
+DEFAULT_ITERATIONS: int = 2000
+
+# The exploration constant of the UCT selection policy
+EXPLORATION: float = math.sqrt(2)
+
+# The number of plies below the previous root that are searched for the next
+# root when reusing the tree between turns (the agent's move, then the opponent's)
+REUSE_DEPTH: int = 2
+
+
+class MCTSNode:
+    """
+    Represents a Node within the Monte Carlo search tree: the board reached by a
+    sequence of move codes from the root, and the statistics of the playouts that
+    passed through it.
+    """
+    def __init__(self, board: "T3Board"):
+        """
+        Parameters:
+            board (T3Board):
+                The board this node represents; only its key and available moves are
+                kept, as the board itself is shared by the whole search.
+        """
+        self.key: tuple[int, ...] = board.key()
+        self.terminal: bool = board.is_win() or board.is_tie()
+        self.untried: list[int] = [] if self.terminal else board.codes()
+        # Popped from the back, so that moves are expanded in tiebreak order
+        self.untried.reverse()
+        self.children: dict[int, "MCTSNode"] = {}
+        self.visits: int = 0
+        # The sum of the playout rewards for the player who moved into this node
+        self.value: float = 0.0
+
+    def best_child(self, exploration: float) -> tuple[int, "MCTSNode"]:
+        """
+        Selects the child that maximizes the UCT score, with ties broken by the earliest
+        action.
+
+        Parameters:
+            exploration (float):
+                The exploration constant weighing the uncertainty of less visited children.
+
+        Returns:
+            tuple[int, MCTSNode]:
+                The move code of the selected child, and the child.
+        """
+        log_visits: float = math.log(self.visits)
+        best: Optional[tuple[int, "MCTSNode"]] = None
+        best_score: float = -math.inf
+        for code, child in self.children.items():
+            score: float = child.value / child.visits + exploration * math.sqrt(log_visits / child.visits)
+            if score > best_score:
+                best, best_score = (code, child), score
+        assert best is not None
+        return best
+
+
+class MCTSPlayer:
+    """
+    AI T3 Player that chooses its actions by Monte Carlo Tree Search, answering within
+    a fixed number of iterations or milliseconds on any board size. The search tree is
+    kept between consecutive turns, so the subtree of the state reached after the
+    agent's and opponent's moves is reused rather than searched again.
+    """
+    def __init__(self, iterations: Optional[int] = None, time_budget_ms: Optional[int] = None,
+                 exploration: float = EXPLORATION, seed: Optional[int] = None):
+        """
+        Parameters:
+            iterations (Optional[int]):
+                The maximum number of playouts per move.
+            time_budget_ms (Optional[int]):
+                The maximum number of milliseconds per move. If neither budget is
+                given, DEFAULT_ITERATIONS playouts are run.
+            exploration (float):
+                The exploration constant of the UCT selection policy.
+            seed (Optional[int]):
+                The random number seed for the playouts, for reproducible choices.
+        """
+        if iterations is None and time_budget_ms is None:
+            iterations = DEFAULT_ITERATIONS
+        self.iterations: Optional[int] = iterations
+        self.time_budget_ms: Optional[int] = time_budget_ms
+        self.exploration: float = exploration
+        self.rng: random.Random = random.Random(seed)
+        self.root: Optional["MCTSNode"] = None
+
+    def choose(self, state: "T3State") -> Optional["T3Action"]:
+        """
+        Chooses the action from the given state that was visited the most by the
+        search, with ties broken by the earliest action. Follows the same contract as
+        t3_player.choose, though the choice is not guaranteed to be optimal.
+
+        Parameters:
+            state (T3State):
+                The board state from which the agent is making a choice.
+
+        Returns:
+            Optional[T3Action]:
+                If the given state is a terminal (i.e., a win or tie), returns None.
+                Otherwise, returns the chosen T3Action.
+        """
+        board: "T3Board" = T3Board(state)
+        if board.is_win() or board.is_tie():
+            return None
+        for code in board.codes():
+            if board.wins_with(code):
+                return board.action(code)
+
+        self.root = self.find_reusable_root(board.key())
+        if self.root is None:
+            self.root = MCTSNode(board)
+        deadline: Optional[float] = None if self.time_budget_ms is None else \
+            time.monotonic() + self.time_budget_ms / 1000
+        iteration: int = 0
+        while (self.iterations is None or iteration < self.iterations) and \
+                (deadline is None or time.monotonic() < deadline):
+            self.iterate(board)
+            iteration += 1
+
+        best_code: Optional[int] = None
+        for code, child in self.root.children.items():
+            if best_code is None or child.visits > self.root.children[best_code].visits or \
+                    (child.visits == self.root.children[best_code].visits and
+                     board.action(code) < board.action(best_code)):
+                best_code = code
+        if best_code is None:
+            return board.action(board.codes()[0])
+        return board.action(best_code)
+
+    def find_reusable_root(self, key: tuple[int, ...]) -> Optional["MCTSNode"]:
+        """
+        Searches the previous turn's tree, up to REUSE_DEPTH plies below its root, for
+        the node of the board with the given key.
+
+        Parameters:
+            key (tuple[int, ...]):
+                The key of the board the agent is now choosing from.
+
+        Returns:
+            Optional[MCTSNode]:
+                The node to reuse as the new root, or None if it is not in the tree.
+        """
+        frontier: list["MCTSNode"] = [] if self.root is None else [self.root]
+        for _ in range(REUSE_DEPTH + 1):
+            for node in frontier:
+                if node.key == key:
+                    return node
+            frontier = [child for node in frontier for child in node.children.values()]
+        return None
+
+    def iterate(self, board: "T3Board") -> None:
+        """
+        Runs a single iteration of the search from the root: selects a path down the
+        tree by UCT, expands one new child at its end, plays out the rest of the game
+        at random, and backs the result up along the path. The board is left as it was
+        given once the iteration returns.
+
+        Parameters:
+            board (T3Board):
+                The board of the root node.
+        """
+        assert self.root is not None
+        node: "MCTSNode" = self.root
+        path: list["MCTSNode"] = [node]
+        made: list[int] = []
+
+        # Selection
+        while not node.untried and node.children:
+            code, node = node.best_child(self.exploration)
+            board.make(code)
+            made.append(code)
+            path.append(node)
+
+        # Expansion
+        if node.untried:
+            code = node.untried.pop()
+            board.make(code)
+            made.append(code)
+            child: "MCTSNode" = MCTSNode(board)
+            node.children[code] = child
+            node = child
+            path.append(node)
+
+        # Simulation
+        while not board.is_win() and not board.is_tie():
+            codes: list[int] = board.codes()
+            winning: Optional[int] = next((code for code in codes if board.wins_with(code)), None)
+            code = self.rng.choice(codes) if winning is None else winning
+            board.make(code)
+            made.append(code)
+        odd_won: Optional[bool] = None if board.is_tie() else not board.odd_turn
+
+        # Backpropagation; each node is credited for the player who moved into it, i.e.,
+        # the player whose turn it no longer is (the last element of its key)
+        for path_node in path:
+            path_node.visits += 1
+            mover_odd: bool = not path_node.key[-1]
+            path_node.value += 0.5 if odd_won is None else 1.0 if odd_won == mover_odd else 0.0
+        for code in reversed(made):
+            board.unmake(code)
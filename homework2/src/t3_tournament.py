@@ -0,0 +1,265 @@
+"""
+Headless tournament harness for the T3Player: plays many games of the AI against
+either itself or a random player, each from a seeded random opening, and reports
+the win / tie rates along with the nodes searched and latency of the AI's moves.
+Useful for measuring the effects of changes made to t3_player.choose.
+"""
+from t3_state import *
+from t3_action import *
+from t3_player import *
+import math
+import random
+import time
+
+# The number of games to be played; players swap between odds and evens
+# every game, so that neither one always moves first
+N_GAMES: int = 1000
+
+# The number of random moves made from START_STATE before the players take
+# over, so that the (deterministic) AI does not play the same game every time
+OPENING_PLIES: int = 2
+
+# The random number seed for the openings and the random player, so that
+# runs can be compared before and after a change; None for different games
+# every run
+SEED: Optional[int] = 2130
+
+# Who the AI plays against: either "ai" for itself or "random"
+OPPONENT: str = "random"
+
+# The number of milliseconds the AI may think per move, or None to search the
+# whole game tree (see t3_player.choose)
+TIME_BUDGET_MS: Optional[int] = None
+
+# The board state each game's opening is played from
+START_STATE = [
+    [0, 0, 0],
+    [0, 0, 0],
+    [0, 0, 0]
+]
+
+
+class TournamentStats:
+    """
+    Tallies the outcomes of a tournament's games, as well as the nodes searched and
+    latency of every move made by an AI player.
+    """
+    def __init__(self) -> None:
+        """
+        Constructs the stats of a tournament that has yet to play any games.
+        """
+        self.games: int = 0
+        self.wins: list[int] = [0, 0]
+        self.ties: int = 0
+        self.nodes: int = 0
+        self.latencies_ms: list[float] = []
+
+    def record_move(self, latency_ms: float, nodes: int) -> None:
+        """
+        Records a single move made by an AI player.
+
+        Parameters:
+            latency_ms (float):
+                The number of milliseconds the move took to choose.
+            nodes (int):
+                The number of nodes the search visited to choose it.
+        """
+        self.latencies_ms.append(latency_ms)
+        self.nodes += nodes
+
+    def record_game(self, winner: Optional[int]) -> None:
+        """
+        Records the outcome of a single game.
+
+        Parameters:
+            winner (Optional[int]):
+                The index of the player who won, or None for a tie.
+        """
+        self.games += 1
+        if winner is None:
+            self.ties += 1
+        else:
+            self.wins[winner] += 1
+
+    def latency_percentile(self, percentile: float) -> float:
+        """
+        Returns the given percentile of the recorded move latencies, by the nearest-rank
+        method.
+
+        Parameters:
+            percentile (float):
+                The percentile, between 0 and 100.
+
+        Returns:
+            float:
+                The latency in milliseconds, or 0.0 if no moves were recorded.
+        """
+        if not self.latencies_ms:
+            return 0.0
+        ordered: list[float] = sorted(self.latencies_ms)
+        rank: int = max(1, math.ceil(len(ordered) * percentile / 100))
+        return ordered[rank - 1]
+
+    def report(self, names: list[str]) -> str:
+        """
+        Summarizes the tournament for printing.
+
+        Parameters:
+            names (list[str]):
+                The names of the two players, in the order of their indices.
+
+        Returns:
+            str:
+                The summary of the tournament's outcomes and AI moves.
+        """
+        games: int = max(1, self.games)
+        moves: int = max(1, len(self.latencies_ms))
+        lines: list[str] = [
+            "= Games: " + str(self.games),
+            "= " + names[0] + " wins: " + str(self.wins[0]) + " (" + "{:.1%}".format(self.wins[0] / games) + ")",
+            "= " + names[1] + " wins: " + str(self.wins[1]) + " (" + "{:.1%}".format(self.wins[1] / games) + ")",
+            "= Ties: " + str(self.ties) + " (" + "{:.1%}".format(self.ties / games) + ")",
+            "= AI moves: " + str(len(self.latencies_ms)) + " | nodes: " + str(self.nodes) +
+            " (" + "{:.0f}".format(self.nodes / moves) + " / move)",
+            "= Latency ms: p50 " + "{:.2f}".format(self.latency_percentile(50)) +
+            " | p90 " + "{:.2f}".format(self.latency_percentile(90)) +
+            " | p99 " + "{:.2f}".format(self.latency_percentile(99)) +
+            " | max " + "{:.2f}".format(self.latency_percentile(100))
+        ]
+        return "\n".join(lines)
+
+# A player is given the state to move in and the tournament's stats, and returns its action
+Player = Callable[["T3State", "TournamentStats"], Optional["T3Action"]]
+
+def ai_player(time_budget_ms: Optional[int]) -> "Player":
+    """
+    Returns a Player that moves by t3_player.choose, recording the nodes searched and
+    latency of every move.
+
+    Parameters:
+        time_budget_ms (Optional[int]):
+            The time budget passed to choose for every move.
+
+    Returns:
+        Player:
+            The AI player.
+    """
+    def play(state: "T3State", stats: "TournamentStats") -> Optional["T3Action"]:
+        context: "SearchContext" = SearchContext(True)
+        start: float = time.perf_counter()
+        action: Optional["T3Action"] = choose(state, context, time_budget_ms)
+        stats.record_move((time.perf_counter() - start) * 1000, context.nodes)
+        return action
+    return play
+
+def random_player(rng: random.Random) -> "Player":
+    """
+    Returns a Player that moves uniformly at random among the legal actions.
+
+    Parameters:
+        rng (random.Random):
+            The random number generator the player draws its moves from.
+
+    Returns:
+        Player:
+            The random player.
+    """
+    def play(state: "T3State", stats: "TournamentStats") -> Optional["T3Action"]:
+        actions: list["T3Action"] = [action for action, _ in state.get_transitions()]
+        return rng.choice(actions) if actions else None
+    return play
+
+def random_opening(start: list[list[int]], plies: int, rng: random.Random) -> "T3State":
+    """
+    Plays the given number of random moves from the start state, with odds moving
+    first; the opening ends early rather than reaching a terminal.
+
+    Parameters:
+        start (list[list[int]]):
+            The board the opening is played on, which is left unmodified.
+        plies (int):
+            The number of random moves to make.
+        rng (random.Random):
+            The random number generator the moves are drawn from.
+
+    Returns:
+        T3State:
+            The state after the opening.
+    """
+    state: "T3State" = T3State(True, [row[:] for row in start])
+    for _ in range(plies):
+        transitions: list[tuple["T3Action", "T3State"]] = [(action, next_state) for action, next_state in
+                                                            state.get_transitions() if not next_state.is_win()]
+        if not transitions:
+            break
+        state = rng.choice(transitions)[1]
+    return state
+
+def play_game(state: "T3State", players: list["Player"], odds_player: int, stats: "TournamentStats") \
+        -> Optional[int]:
+    """
+    Plays a single game from the given state until it reaches a terminal.
+
+    Parameters:
+        state (T3State):
+            The state the game is played from.
+        players (list[Player]):
+            The two players of the game.
+        odds_player (int):
+            The index of the player who plays as odds.
+        stats (TournamentStats):
+            The stats the players' moves are recorded into.
+
+    Returns:
+        Optional[int]:
+            The index of the player who won, or None for a tie.
+    """
+    while not state.is_win() and not state.is_tie():
+        mover: int = odds_player if state._odd_turn else 1 - odds_player
+        state = state.get_next_state(players[mover](state, stats))
+    if state.is_tie():
+        return None
+    # The win belongs to whoever moved last, i.e., whose turn it no longer is
+    return 1 - odds_player if state._odd_turn else odds_player
+
+def run_tournament(n_games: int, opponent: str, seed: Optional[int], opening_plies: int,
+                   time_budget_ms: Optional[int], start: list[list[int]]) -> "TournamentStats":
+    """
+    Plays a tournament of games between the AI (player 0) and the given opponent
+    (player 1), who swap between odds and evens every game.
+
+    Parameters:
+        n_games (int):
+            The number of games to be played.
+        opponent (str):
+            Either "ai" to play the AI against itself, or "random".
+        seed (Optional[int]):
+            The random number seed for the openings and random player.
+        opening_plies (int):
+            The number of random moves each game opens with.
+        time_budget_ms (Optional[int]):
+            The time budget of the AI's moves.
+        start (list[list[int]]):
+            The board each game's opening is played from.
+
+    Returns:
+        TournamentStats:
+            The stats of the tournament.
+    """
+    if opponent not in ("ai", "random"):
+        raise ValueError("[X] Opponent must be \"ai\" or \"random\", but was " + opponent)
+    rng: random.Random = random.Random(seed)
+    players: list["Player"] = [ai_player(time_budget_ms),
+                               ai_player(time_budget_ms) if opponent == "ai" else random_player(rng)]
+    stats: "TournamentStats" = TournamentStats()
+    for game in range(n_games):
+        state: "T3State" = random_opening(start, opening_plies, rng)
+        stats.record_game(play_game(state, players, game % 2, stats))
+    return stats
+
+if __name__ == '__main__':
+    names: list[str] = ["AI", "AI (2)" if OPPONENT == "ai" else "Random"]
+    stats = run_tournament(N_GAMES, OPPONENT, SEED, OPENING_PLIES, TIME_BUDGET_MS, START_STATE)
+    print("=================================")
+    print(stats.report(names))
+    print("=================================")
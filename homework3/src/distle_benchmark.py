@@ -0,0 +1,408 @@
+'''
+Headless benchmark for Distle players: plays a game for every word of a dictionary
+(or a seeded sample of them) across worker processes, and reports the win rate,
+the number of guesses taken, the latency of the player's make_guess and
+get_feedback calls, and the hit rate of its cache of transforms (if it has one).
+Each game's result can be saved to a CSV file, and each run's summary appended to
+another, so that changes to a player can be tracked over time.
+
+Run from this directory, e.g.:
+    python distle_benchmark.py --dictionary ../dat/dictionary6.txt --games 0 --csv games.csv
+'''
+from distle_game import *
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import csv
+import importlib
+import math
+import os
+import random
+import time
+
+# Defaults of the command line options below
+DICTIONARY_PATH: str = "../dat/dictionary14.txt"
+PLAYER: str = "distle_player:DistlePlayer"
+MAX_GUESSES: int = 10
+GAMES: int = 200
+SEED: int = 2130
+WORKERS: int = os.cpu_count() or 1
+
+# The columns of the CSV files of game results and of run summaries
+GAME_COLUMNS: list[str] = ["word", "won", "guesses", "guess_ms", "feedback_ms", "cache_hits", "cache_misses"]
+SUMMARY_COLUMNS: list[str] = ["time", "dictionary", "player", "games", "win_rate", "mean_guesses",
+                              "p50_guesses", "p90_guesses", "guess_p50_ms", "guess_p99_ms",
+                              "feedback_p50_ms", "feedback_p99_ms", "cache_hit_rate", "seconds"]
+
+
+class GameResult(NamedTuple):
+    '''
+    The outcome of a single benchmarked game, the milliseconds taken by each of the
+    player's calls during it, and its cache's hits and misses during it.
+    '''
+    word: str
+    won: bool
+    guesses: int
+    guess_ms: list[float]
+    feedback_ms: list[float]
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+
+class TimedPlayer:
+    '''
+    Stands in for a DistlePlayer in a DistleGame, passing every call on to the player
+    while timing its make_guess and get_feedback calls, and noting the hits and misses
+    of its feedback_cache at the start of each game.
+    '''
+
+    def __init__(self, player: "DistlePlayer") -> None:
+        '''
+        Parameters:
+            player (DistlePlayer):
+                The player whose calls are timed
+        '''
+        self.player: "DistlePlayer" = player
+        self.guess_ms: list[float] = []
+        self.feedback_ms: list[float] = []
+        self.cache_hits: int = 0
+        self.cache_misses: int = 0
+
+    def cache(self) -> Optional["TransformCache"]:
+        '''
+        Returns:
+            Optional[TransformCache]:
+                The player's cache of transforms, or None if it has none
+        '''
+        cache: object = getattr(self.player, "feedback_cache", None)
+        return cache if isinstance(cache, TransformCache) else None
+
+    def start_new_game(self, dictionary: AbstractSet[str], max_guesses: int,
+                       index: Optional["DistleDictionary"] = None) -> None:
+        '''
+        Starts the player's next game, clearing the times of the last one and noting
+        where its cache's counts of hits and misses stand.
+
+        Parameters:
+            dictionary (AbstractSet[str]):
+                The words the secret word is drawn from
+            max_guesses (int):
+                The number of guesses the player is allowed in the game
+            index (Optional[DistleDictionary]):
+                The dictionary's index, if the game has one
+        '''
+        self.guess_ms = []
+        self.feedback_ms = []
+        cache: Optional[TransformCache] = self.cache()
+        self.cache_hits, self.cache_misses = (0, 0) if cache is None else (cache.hits, cache.misses)
+        self.player.start_new_game(dictionary, max_guesses, index)
+
+    def make_guess(self) -> str:
+        '''
+        Returns:
+            str:
+                The player's next guess, whose milliseconds are added to guess_ms
+        '''
+        start: float = time.perf_counter()
+        guess: str = self.player.make_guess()
+        self.guess_ms.append((time.perf_counter() - start) * 1000)
+        return guess
+
+    def get_feedback(self, guess: str, edit_distance: int, transforms: list[str]) -> None:
+        '''
+        Passes the feedback of a guess on to the player, adding the milliseconds it
+        takes to feedback_ms.
+
+        Parameters:
+            guess (str):
+                The guess that received the feedback
+            edit_distance (int):
+                The edit distance from the guess to the secret word
+            transforms (list[str]):
+                The transforms from the guess to the secret word
+        '''
+        start: float = time.perf_counter()
+        self.player.get_feedback(guess, edit_distance, transforms)
+        self.feedback_ms.append((time.perf_counter() - start) * 1000)
+
+
+def percentile(values: list[float], percent: float) -> float:
+    '''
+    Returns the given percentile of the values, by the nearest-rank method.
+
+    Parameters:
+        values (list[float]):
+            The values, in any order
+        percent (float):
+            The percentile, between 0 and 100
+
+    Returns:
+        float:
+            The value at that percentile, or 0.0 if there are none
+    '''
+    if not values:
+        return 0.0
+    ordered: list[float] = sorted(values)
+    rank: int = max(1, math.ceil(len(ordered) * percent / 100))
+    return ordered[rank - 1]
+
+
+class BenchmarkStats:
+    '''
+    Summarizes the results of a benchmark's games. A lost game counts as taking one
+    more guess than were allowed, so that losing is never better than winning late.
+    '''
+
+    def __init__(self, results: list["GameResult"], max_guesses: int, seconds: float) -> None:
+        '''
+        Parameters:
+            results (list[GameResult]):
+                The results of the benchmark's games
+            max_guesses (int):
+                The number of guesses the player was allowed per game
+            seconds (float):
+                The wall clock time the benchmark took
+        '''
+        self.results: list["GameResult"] = results
+        self.seconds: float = seconds
+        self.wins: int = sum(1 for result in results if result.won)
+        self.guesses: list[float] = [result.guesses if result.won else max_guesses + 1 for result in results]
+        self.guess_ms: list[float] = [ms for result in results for ms in result.guess_ms]
+        self.feedback_ms: list[float] = [ms for result in results for ms in result.feedback_ms]
+        self.cache_hits: int = sum(result.cache_hits for result in results)
+        self.cache_misses: int = sum(result.cache_misses for result in results)
+
+    def win_rate(self) -> float:
+        '''
+        Returns:
+            float:
+                The fraction of the games that were won, or 0.0 if there were none
+        '''
+        return self.wins / max(1, len(self.results))
+
+    def mean_guesses(self) -> float:
+        '''
+        Returns:
+            float:
+                The mean number of guesses per game, counting losses as stated above
+        '''
+        return sum(self.guesses) / max(1, len(self.guesses))
+
+    def cache_hit_rate(self) -> float:
+        '''
+        Returns:
+            float:
+                The fraction of the player's cache lookups that were hits, or 0.0 if
+                it made none
+        '''
+        return self.cache_hits / max(1, self.cache_hits + self.cache_misses)
+
+    def summary(self, dictionary_path: str, player: str) -> dict[str, str]:
+        '''
+        Returns:
+            dict[str, str]:
+                The summary of the benchmark as a row of SUMMARY_COLUMNS
+        '''
+        return {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "dictionary": dictionary_path, "player": player,
+            "games": str(len(self.results)), "win_rate": "{:.4f}".format(self.win_rate()),
+            "mean_guesses": "{:.3f}".format(self.mean_guesses()),
+            "p50_guesses": "{:.0f}".format(percentile(self.guesses, 50)),
+            "p90_guesses": "{:.0f}".format(percentile(self.guesses, 90)),
+            "guess_p50_ms": "{:.3f}".format(percentile(self.guess_ms, 50)),
+            "guess_p99_ms": "{:.3f}".format(percentile(self.guess_ms, 99)),
+            "feedback_p50_ms": "{:.3f}".format(percentile(self.feedback_ms, 50)),
+            "feedback_p99_ms": "{:.3f}".format(percentile(self.feedback_ms, 99)),
+            "cache_hit_rate": "{:.4f}".format(self.cache_hit_rate()),
+            "seconds": "{:.2f}".format(self.seconds)
+        }
+
+    def report(self) -> str:
+        '''
+        Returns:
+            str:
+                The summary of the benchmark, for printing
+        '''
+        games: int = len(self.results)
+        lines: list[str] = [
+            "= Games: " + str(games) + " in " + "{:.1f}".format(self.seconds) + "s",
+            "= Wins: " + str(self.wins) + " (" + "{:.1%}".format(self.win_rate()) + ")",
+            "= Guesses: mean " + "{:.2f}".format(self.mean_guesses()) +
+            " | p50 " + "{:.0f}".format(percentile(self.guesses, 50)) +
+            " | p90 " + "{:.0f}".format(percentile(self.guesses, 90)) +
+            " | max " + "{:.0f}".format(percentile(self.guesses, 100)),
+            "= make_guess ms: p50 " + "{:.2f}".format(percentile(self.guess_ms, 50)) +
+            " | p90 " + "{:.2f}".format(percentile(self.guess_ms, 90)) +
+            " | p99 " + "{:.2f}".format(percentile(self.guess_ms, 99)) +
+            " | max " + "{:.2f}".format(percentile(self.guess_ms, 100)),
+            "= get_feedback ms: p50 " + "{:.2f}".format(percentile(self.feedback_ms, 50)) +
+            " | p90 " + "{:.2f}".format(percentile(self.feedback_ms, 90)) +
+            " | p99 " + "{:.2f}".format(percentile(self.feedback_ms, 99)) +
+            " | max " + "{:.2f}".format(percentile(self.feedback_ms, 100)),
+            "= Cache: " + str(self.cache_hits) + " hits | " + str(self.cache_misses) + " misses (" +
+            "{:.1%}".format(self.cache_hit_rate()) + " hit rate)"
+        ]
+        return "\n".join(lines)
+
+
+def load_player(spec: str) -> "DistlePlayer":
+    '''
+    Constructs the player named by the given spec.
+
+    Parameters:
+        spec (str):
+            The player's module and class, as "module:Class", whose constructor
+            takes no arguments
+
+    Returns:
+        DistlePlayer:
+            A new instance of the player
+    '''
+    module_name, _, class_name = spec.partition(":")
+    if not module_name or not class_name:
+        raise ValueError("[X] Player must be given as \"module:Class\", but was " + spec)
+    player_class: Callable[[], "DistlePlayer"] = getattr(importlib.import_module(module_name), class_name)
+    return player_class()
+
+
+# Each worker process keeps a single game and timed player, so the dictionary is
+# loaded (and the player's caches warmed) once per worker rather than once per game
+_worker_game: Optional["DistleGame"] = None
+_worker_player: Optional["TimedPlayer"] = None
+_worker_max_guesses: int = MAX_GUESSES
+
+def _init_worker(dictionary_path: str, player: str, max_guesses: int, cache_path: Optional[str]) -> None:
+    '''
+    Initializes the game and player of a benchmark's worker process, warming the
+    player's cache of transforms from the given file if it exists.
+    '''
+    global _worker_game, _worker_player, _worker_max_guesses
+    _worker_player = TimedPlayer(load_player(player))
+    cache: Optional[TransformCache] = _worker_player.cache()
+    if cache is not None and cache_path is not None and os.path.exists(cache_path):
+        setattr(_worker_player.player, "feedback_cache", TransformCache.load(cache_path, cache.capacity))
+    _worker_game = DistleGame(dictionary_path, False, cast("DistlePlayer", _worker_player))
+    _worker_max_guesses = max_guesses
+
+def _play_in_worker(word: str) -> "GameResult":
+    '''
+    Plays a single game of a benchmark in a worker process.
+
+    Parameters:
+        word (str):
+            The secret word of the game
+
+    Returns:
+        GameResult:
+            The result of the game
+    '''
+    if _worker_game is None or _worker_player is None:
+        raise RuntimeError("[X] Worker process was not initialized")
+    won: bool = _worker_game.new_game(_worker_max_guesses, word)
+    cache: Optional[TransformCache] = _worker_player.cache()
+    hits: int = 0 if cache is None else cache.hits - _worker_player.cache_hits
+    misses: int = 0 if cache is None else cache.misses - _worker_player.cache_misses
+    return GameResult(word, won, _worker_game._guesses, _worker_player.guess_ms, _worker_player.feedback_ms,
+                      hits, misses)
+
+
+def run_benchmark(dictionary_path: str, player: str, games: int, seed: int, workers: int,
+                  max_guesses: int, cache_path: Optional[str] = None) -> "BenchmarkStats":
+    '''
+    Plays the benchmark's games and gathers their results.
+
+    Parameters:
+        dictionary_path (str):
+            The path to the dictionary, relative to distle_game.py
+        player (str):
+            The player, as "module:Class"
+        games (int):
+            The number of games, each with a different secret word sampled from the
+            dictionary; 0 (or more than there are words) plays every word once
+        seed (int):
+            The random number seed of the sample of secret words
+        workers (int):
+            The number of processes the games are split across; 1 plays them all
+            in this process
+        max_guesses (int):
+            The number of guesses the player is allowed per game
+        cache_path (Optional[str]):
+            A file of cached transforms (see TransformCache.save) that every player
+            starts from, if it exists; a run in this process writes its player's
+            cache back to it afterwards, so that the next run reuses its work
+
+    Returns:
+        BenchmarkStats:
+            The stats of the games, in the (sorted) order of their secret words
+    '''
+    words: list[str] = list(DistleGame(dictionary_path, False, None).rand_word_list)
+    if 0 < games < len(words):
+        words = sorted(random.Random(seed).sample(words, games))
+
+    start: float = time.perf_counter()
+    results: list["GameResult"] = []
+    if workers > 1 and len(words) > 1:
+        # Neighboring words share their length and prefixes, and so the player's cached feedback
+        chunksize: int = max(1, len(words) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(dictionary_path, player, max_guesses, cache_path)) as pool:
+            results = list(pool.map(_play_in_worker, words, chunksize=chunksize))
+        return BenchmarkStats(results, max_guesses, time.perf_counter() - start)
+
+    _init_worker(dictionary_path, player, max_guesses, cache_path)
+    results = [_play_in_worker(word) for word in words]
+    stats: BenchmarkStats = BenchmarkStats(results, max_guesses, time.perf_counter() - start)
+    cache: Optional[TransformCache] = None if _worker_player is None else _worker_player.cache()
+    if cache is not None and cache_path is not None:
+        cache.save(cache_path)
+    return stats
+
+
+def write_games_csv(path: str, results: list["GameResult"]) -> None:
+    '''
+    Writes a row of GAME_COLUMNS for each game's result to the given CSV file, with
+    the total milliseconds of each kind of call the player made during it.
+    '''
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(GAME_COLUMNS)
+        for result in results:
+            writer.writerow([result.word, int(result.won), result.guesses,
+                             "{:.3f}".format(sum(result.guess_ms)), "{:.3f}".format(sum(result.feedback_ms)),
+                             result.cache_hits, result.cache_misses])
+
+
+def append_summary_csv(path: str, summary: dict[str, str]) -> None:
+    '''
+    Appends a run's summary to the given CSV file, writing its header first if the
+    file is new.
+    '''
+    new_file: bool = not os.path.exists(path) or os.path.getsize(path) == 0
+    with open(path, "a", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=SUMMARY_COLUMNS)
+        if new_file:
+            writer.writeheader()
+        writer.writerow(summary)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmarks a Distle player over many games.")
+    parser.add_argument("--dictionary", default=DICTIONARY_PATH, help="path to the dictionary file")
+    parser.add_argument("--player", default=PLAYER, help="the player to benchmark, as module:Class")
+    parser.add_argument("--games", type=int, default=GAMES, help="number of sampled secret words; 0 for all")
+    parser.add_argument("--seed", type=int, default=SEED, help="random number seed of the sample")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="number of processes to play across")
+    parser.add_argument("--max-guesses", type=int, default=MAX_GUESSES, help="guesses allowed per game")
+    parser.add_argument("--csv", help="CSV file to write each game's result to")
+    parser.add_argument("--summary", help="CSV file to append the run's summary to")
+    parser.add_argument("--cache", help="file of cached transforms to start from (and save to, with 1 worker)")
+    args = parser.parse_args()
+
+    stats = run_benchmark(args.dictionary, args.player, args.games, args.seed, args.workers, args.max_guesses,
+                          args.cache)
+    print("=================================")
+    print(stats.report())
+    print("=================================")
+    if args.csv:
+        write_games_csv(args.csv, stats.results)
+    if args.summary:
+        append_summary_csv(args.summary, stats.summary(args.dictionary, args.player))
@@ -0,0 +1,202 @@
+'''
+BK-tree (Burkhard-Keller tree) over the words of a Distle dictionary, which finds
+the words within a ring of distances of a query word while skipping every subtree
+that the triangle inequality proves to be outside of it.
+
+The Distle edit distance, which allows transpositions, is not a metric (e.g., "ca"
+is 3 edits from "abc", but only 2 by way of "ac"), so the tree is indexed by the
+Levenshtein distance instead, which bounds it: a word at edit distance d from the
+guess, with t transpositions among its transforms, is at a Levenshtein distance
+between d and d + t, and only that ring needs searching.
+
+Run this file to write the trees of the repository's dictionaries beside them.
+'''
+from typing import *
+from edit_dist_utils import *
+import json
+import os
+import time
+
+# Appended to a dictionary file's path for the path of the file of its BK-trees
+BK_TREE_SUFFIX: str = ".bktree.json"
+
+
+class BKTree:
+    '''
+    A BK-tree of words: every word below a node is a child subtree keyed by its
+    Levenshtein distance to that node's word. Nodes are kept in parallel lists in
+    the order they were added, which is all that is needed to rebuild the tree.
+    '''
+
+    def __init__(self, words: Iterable[str] = ()) -> None:
+        '''
+        Constructs a tree holding the given words.
+
+        Parameters:
+            words (Iterable[str]):
+                The words of the tree, added in the given order; duplicates are
+                only kept once
+        '''
+        self.words: list[str] = []
+        # The node each node hangs from (-1 for the root), and its distance to it
+        self.parents: list[int] = []
+        self.distances: list[int] = []
+        self.children: list[dict[int, int]] = []
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str) -> None:
+        '''
+        Adds the given word to the tree, unless it is already in it.
+
+        Parameters:
+            word (str):
+                The word being added
+        '''
+        if not self.words:
+            self._attach(word, -1, 0)
+            return
+        masks: dict[str, int] = get_char_masks(word)
+        node: int = 0
+        while True:
+            distance: int = levenshtein_distance(word, self.words[node], masks)
+            if distance == 0:
+                return
+            child: Optional[int] = self.children[node].get(distance)
+            if child is None:
+                self._attach(word, node, distance)
+                return
+            node = child
+
+    def _attach(self, word: str, parent: int, distance: int) -> None:
+        '''
+        Appends a new node for the given word below the given parent node.
+        '''
+        if parent >= 0:
+            self.children[parent][distance] = len(self.words)
+        self.words.append(word)
+        self.parents.append(parent)
+        self.distances.append(distance)
+        self.children.append({})
+
+    def within(self, query: str, low: int, high: int) -> list[str]:
+        '''
+        Returns the words of the tree whose Levenshtein distance from the given query
+        is between low and high, inclusive. A child subtree at distance k from a node
+        at distance n from the query only holds words at distances between |n - k| and
+        n + k from the query, so it is skipped unless that range meets the ring.
+
+        Parameters:
+            query (str):
+                The word the distances are measured from
+            low, high (int):
+                The least and greatest distance of the words returned
+
+        Returns:
+            list[str]:
+                The words in the ring, in no particular order
+        '''
+        found: list[str] = []
+        if not self.words:
+            return found
+        masks: dict[str, int] = get_char_masks(query)
+        words: list[str] = self.words
+        children: list[dict[int, int]] = self.children
+        stack: list[int] = [0]
+        while stack:
+            node: int = stack.pop()
+            distance: int = levenshtein_distance(query, words[node], masks)
+            if low <= distance <= high:
+                found.append(words[node])
+            least: int = max(distance - high, low - distance)
+            most: int = distance + high
+            for edge, child in children[node].items():
+                if least <= edge <= most:
+                    stack.append(child)
+        return found
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def to_json(self) -> dict[str, list[Any]]:
+        '''
+        Returns:
+            dict[str, list[Any]]:
+                The nodes of the tree, in a form that json can write and from_json reads
+        '''
+        return {"words": self.words, "parents": self.parents, "distances": self.distances}
+
+    @staticmethod
+    def from_json(contents: dict[str, list[Any]]) -> "BKTree":
+        '''
+        Rebuilds a tree from the result of to_json, without computing any distances.
+
+        Parameters:
+            contents (dict[str, list[Any]]):
+                The nodes of the tree
+
+        Returns:
+            BKTree:
+                The tree that was written
+        '''
+        tree: BKTree = BKTree()
+        for word, parent, distance in zip(contents["words"], contents["parents"], contents["distances"]):
+            tree._attach(str(word), int(parent), int(distance))
+        return tree
+
+
+def save_bk_trees(path: str, dictionary_hash: str, trees: dict[int, "BKTree"]) -> None:
+    '''
+    Writes the BK-trees of a dictionary's words of each length to the given path as JSON.
+
+    Parameters:
+        path (str):
+            The path of the file to write
+        dictionary_hash (str):
+            The content hash of the dictionary the trees hold the words of
+        trees (dict[int, BKTree]):
+            The tree of each word length
+    '''
+    with open(path, "w") as file:
+        json.dump({"dictionary_hash": dictionary_hash,
+                   "trees": {str(length): tree.to_json() for length, tree in trees.items()}}, file)
+
+
+def load_bk_trees(path: str, dictionary_hash: str) -> Optional[dict[int, "BKTree"]]:
+    '''
+    Reads the BK-trees previously written by save_bk_trees.
+
+    Parameters:
+        path (str):
+            The path of the file to read
+        dictionary_hash (str):
+            The content hash of the dictionary the trees are expected to hold
+
+    Returns:
+        Optional[dict[int, BKTree]]:
+            The tree of each word length, or None if the trees are of another dictionary
+    '''
+    with open(path, "r") as file:
+        contents: dict[str, Any] = json.load(file)
+    if contents["dictionary_hash"] != dictionary_hash:
+        return None
+    return {int(length): BKTree.from_json(tree) for length, tree in contents["trees"].items()}
+
+
+def main() -> None:
+    '''
+    Writes the BK-trees of each of the repository's dictionaries beside it.
+    '''
+    # Imported here, as the dictionary module itself imports this one
+    from distle_dictionary import DistleDictionary
+    script_dir: str = os.path.dirname(__file__)
+    for name in ["dictionary6.txt", "dictionary10.txt", "dictionary14.txt"]:
+        start: float = time.time()
+        dictionary: DistleDictionary = DistleDictionary.load(os.path.join(script_dir, "../dat", name))
+        dictionary.save_bk_trees()
+        print("[!] " + name + ": " + str(len(dictionary.by_length)) + " trees (" +
+              str(round(time.time() - start, 1)) + "s)")
+
+
+if __name__ == '__main__':
+    main()
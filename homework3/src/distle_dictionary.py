@@ -0,0 +1,326 @@
+'''
+Shared, read-only index of the words of a Distle dictionary, built once when the
+dictionary is loaded and handed to every game's DistlePlayer, along with the book
+of precomputed opening guesses and the BK-trees stored beside the dictionary's file.
+'''
+from typing import *
+from edit_dist_utils import *
+from distle_bk_tree import *
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+# Appended to a dictionary file's path for the path of its opening book
+OPENINGS_SUFFIX: str = ".openings.json"
+
+# Appended to a dictionary file's path for the path of its binary snapshot, which
+# is laid out as a header (magic bytes, version, the size and modification time of
+# the text file it was made from, and the number of word lengths), then the length
+# of the words and byte size of each bucket, then the buckets' newline-separated,
+# sorted words, in order of length, as a single UTF-8 blob
+SNAPSHOT_SUFFIX: str = ".snapshot"
+SNAPSHOT_MAGIC: bytes = b"DSNP"
+SNAPSHOT_VERSION: int = 1
+SNAPSHOT_HEADER: str = "<4sBqqI"
+SNAPSHOT_BUCKET: str = "<II"
+
+
+class OpeningBook:
+    '''
+    The precomputed best first guess of a dictionary, and the best second guess
+    after each feedback the first guess may receive, which are the same every game.
+    '''
+
+    def __init__(self, dictionary_hash: str, first: str, second: dict[str, str]) -> None:
+        '''
+        Parameters:
+            dictionary_hash (str):
+                The content hash of the dictionary the book was computed for
+            first (str):
+                The first guess of every game
+            second (dict[str, str]):
+                The second guess after each feedback to the first, keyed by its
+                transforms joined into a single string (e.g., "TRD")
+        '''
+        self.dictionary_hash: str = dictionary_hash
+        self.first: str = first
+        self.second: dict[str, str] = second
+
+    def second_guess(self, transforms: list[str]) -> Optional[str]:
+        '''
+        Returns the second guess after the first guess received the given transforms.
+
+        Parameters:
+            transforms (list[str]):
+                The feedback to the first guess
+
+        Returns:
+            Optional[str]:
+                The second guess, or None if the book has none for that feedback
+        '''
+        return self.second.get("".join(transforms))
+
+    def save(self, path: str) -> None:
+        '''
+        Writes the book to the given path as JSON.
+
+        Parameters:
+            path (str):
+                The path of the file to write
+        '''
+        with open(path, "w") as file:
+            json.dump({"dictionary_hash": self.dictionary_hash, "first": self.first, "second": self.second},
+                      file, indent=1, sort_keys=True)
+
+    @staticmethod
+    def load(path: str) -> "OpeningBook":
+        '''
+        Reads a book previously written by save.
+
+        Parameters:
+            path (str):
+                The path of the file to read
+
+        Returns:
+            OpeningBook:
+                The book stored in the file
+        '''
+        with open(path, "r") as file:
+            contents: dict[str, Any] = json.load(file)
+        return OpeningBook(str(contents["dictionary_hash"]), str(contents["first"]),
+                           {str(key): str(value) for key, value in contents["second"].items()})
+
+
+def _read_snapshot(snapshot_path: str, source: os.stat_result) -> Optional[dict[int, tuple[str, ...]]]:
+    '''
+    Reads the buckets of words of a snapshot written by DistleDictionary.save_snapshot,
+    mapping the file into memory and decoding each bucket's slice of it in one go.
+
+    Returns:
+        Optional[dict[int, tuple[str, ...]]]:
+            The sorted words of each length, or None if the snapshot is not of the
+            given text file as it is now (or is not a snapshot at all)
+    '''
+    with open(snapshot_path, "rb") as file:
+        if os.fstat(file.fileno()).st_size < struct.calcsize(SNAPSHOT_HEADER):
+            return None
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as blob:
+            magic, version, size, mtime_ns, buckets = struct.unpack_from(SNAPSHOT_HEADER, blob, 0)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION or \
+                    size != source.st_size or mtime_ns != source.st_mtime_ns:
+                return None
+            offset: int = struct.calcsize(SNAPSHOT_HEADER)
+            sizes: list[tuple[int, int]] = []
+            for _ in range(buckets):
+                sizes.append(struct.unpack_from(SNAPSHOT_BUCKET, blob, offset))
+                offset += struct.calcsize(SNAPSHOT_BUCKET)
+            by_length: dict[int, tuple[str, ...]] = {}
+            for length, blob_size in sizes:
+                by_length[length] = tuple(blob[offset:offset + blob_size].decode().split("\n"))
+                offset += blob_size
+            return by_length
+
+
+class DistleDictionary:
+    '''
+    The words of a Distle dictionary in sorted order, along with the words of each
+    length, so that a player who has deduced the length of the secret word can
+    select its candidates without scanning the whole dictionary.
+    '''
+
+    def __init__(self, words: Iterable[str], path: Optional[str] = None) -> None:
+        '''
+        Indexes the given words.
+
+        Parameters:
+            words (Iterable[str]):
+                The words of the dictionary; duplicates are only kept once
+            path (Optional[str]):
+                The path of the file the words were read from, beside which the
+                dictionary's opening book is looked for
+        '''
+        unique: tuple[str, ...] = tuple(sorted(set(words)))
+        by_length: dict[int, list[str]] = {}
+        for word in unique:
+            by_length.setdefault(len(word), []).append(word)
+        self._setup(unique, {length: tuple(bucket) for length, bucket in by_length.items()}, path)
+
+    def _setup(self, words: tuple[str, ...], by_length: dict[int, tuple[str, ...]], path: Optional[str]) -> None:
+        '''
+        Sets the attributes of a dictionary of the given sorted words, already split by length.
+        '''
+        self.words: tuple[str, ...] = words
+        self.by_length: dict[int, tuple[str, ...]] = by_length
+        self.path: Optional[str] = path
+        self._content_hash: Optional[str] = None
+        self._openings: Optional[OpeningBook] = None
+        self._openings_loaded: bool = False
+        self._bk_trees: Optional[dict[int, BKTree]] = None
+        self._letter_bags: Optional[dict[str, int]] = None
+
+    @staticmethod
+    def load(path: str) -> "DistleDictionary":
+        '''
+        Reads the dictionary of the given text file, which has a word on each line.
+        The first load writes a binary snapshot of the sorted and bucketed words beside
+        the file, which later loads read instead for as long as the file is unchanged.
+
+        Parameters:
+            path (str):
+                The path of the dictionary's text file
+
+        Returns:
+            DistleDictionary:
+                The dictionary of the file's words
+        '''
+        source: os.stat_result = os.stat(path)
+        snapshot_path: str = path + SNAPSHOT_SUFFIX
+        if os.path.exists(snapshot_path):
+            by_length: Optional[dict[int, tuple[str, ...]]] = _read_snapshot(snapshot_path, source)
+            if by_length is not None:
+                dictionary: DistleDictionary = DistleDictionary.__new__(DistleDictionary)
+                # The buckets are sorted runs, which sorted merges rather than sorting afresh
+                dictionary._setup(tuple(sorted(word for bucket in by_length.values() for word in bucket)),
+                                  by_length, path)
+                return dictionary
+
+        with open(path, "r") as file:
+            dictionary = DistleDictionary((line.rstrip() for line in file), path)
+        try:
+            dictionary.save_snapshot(snapshot_path, source)
+        except OSError:
+            # The snapshot only saves time, so a directory that cannot be written to is no matter
+            pass
+        return dictionary
+
+    def save_snapshot(self, snapshot_path: str, source: os.stat_result) -> None:
+        '''
+        Writes the dictionary's binary snapshot to the given path.
+
+        Parameters:
+            snapshot_path (str):
+                The path of the file to write
+            source (os.stat_result):
+                The status of the text file the dictionary was read from, by which
+                a stale snapshot is later recognized
+        '''
+        lengths: list[int] = sorted(self.by_length)
+        blobs: list[bytes] = ["\n".join(self.by_length[length]).encode() for length in lengths]
+        # Written in full under another name first, so that a reader never sees half of a snapshot
+        partial_path: str = snapshot_path + "." + str(os.getpid())
+        try:
+            with open(partial_path, "wb") as file:
+                file.write(struct.pack(SNAPSHOT_HEADER, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, source.st_size,
+                                       source.st_mtime_ns, len(lengths)))
+                for length, blob in zip(lengths, blobs):
+                    file.write(struct.pack(SNAPSHOT_BUCKET, length, len(blob)))
+                for blob in blobs:
+                    file.write(blob)
+            os.replace(partial_path, snapshot_path)
+        except BaseException:
+            # A snapshot that failed to be written is of no use to anyone, so none is left behind
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+
+    def with_length(self, length: int) -> tuple[str, ...]:
+        '''
+        Returns the words of the given length, in sorted order.
+
+        Parameters:
+            length (int):
+                The length of the words to return
+
+        Returns:
+            tuple[str, ...]:
+                The words of that length, which is empty if there are none
+        '''
+        return self.by_length.get(length, ())
+
+    def content_hash(self) -> str:
+        '''
+        Returns:
+            str:
+                A hash of the dictionary's words, which identifies its contents
+                regardless of the order of its file's lines
+        '''
+        if self._content_hash is None:
+            self._content_hash = hashlib.sha256("\n".join(self.words).encode()).hexdigest()
+        return self._content_hash
+
+    def openings(self) -> Optional[OpeningBook]:
+        '''
+        Returns the dictionary's opening book, which is read from beside its file
+        the first time it is asked for.
+
+        Returns:
+            Optional[OpeningBook]:
+                The opening book, or None if there is none for the dictionary's
+                current contents
+        '''
+        if not self._openings_loaded:
+            self._openings_loaded = True
+            if self.path is not None and os.path.exists(self.path + OPENINGS_SUFFIX):
+                book: OpeningBook = OpeningBook.load(self.path + OPENINGS_SUFFIX)
+                if book.dictionary_hash == self.content_hash():
+                    self._openings = book
+        return self._openings
+
+    def letter_bags(self) -> dict[str, int]:
+        '''
+        Returns:
+            dict[str, int]:
+                The letter bag (see get_letter_bag) of every word, which are computed
+                the first time they are asked for
+        '''
+        if self._letter_bags is None:
+            self._letter_bags = {word: get_letter_bag(word) for word in self.words}
+        return self._letter_bags
+
+    def bk_tree(self, length: int) -> BKTree:
+        '''
+        Returns the BK-tree of the words of the given length. The trees are read from
+        beside the dictionary's file the first time one is asked for, if they were
+        saved for its current contents, and are otherwise built as they are needed.
+
+        Parameters:
+            length (int):
+                The length of the words in the tree
+
+        Returns:
+            BKTree:
+                The tree of the words of that length, which is empty if there are none
+        '''
+        if self._bk_trees is None:
+            self._bk_trees = {}
+            if self.path is not None and os.path.exists(self.path + BK_TREE_SUFFIX):
+                self._bk_trees = load_bk_trees(self.path + BK_TREE_SUFFIX, self.content_hash()) or {}
+        if length not in self._bk_trees:
+            self._bk_trees[length] = BKTree(self.with_length(length))
+        return self._bk_trees[length]
+
+    def save_bk_trees(self) -> None:
+        '''
+        Builds the BK-tree of every word length, and writes them beside the
+        dictionary's file for bk_tree to read.
+        '''
+        if self.path is None:
+            raise ValueError("[X] Only a dictionary read from a file can save its BK-trees beside it")
+        trees: dict[int, BKTree] = {length: self.bk_tree(length) for length in self.by_length}
+        save_bk_trees(self.path + BK_TREE_SUFFIX, self.content_hash(), trees)
+
+    def __contains__(self, word: object) -> bool:
+        if not isinstance(word, str):
+            return False
+        bucket: tuple[str, ...] = self.with_length(len(word))
+        index: int = bisect.bisect_left(bucket, word)
+        return index < len(bucket) and bucket[index] == word
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.words)
+
+    def __len__(self) -> int:
+        return len(self.words)
@@ -1,9 +1,9 @@
 from edit_dist_utils import *
 from distle_player import *
+from distle_dictionary import *
 from typing import *
 import random
 import os
-import copy
 
 class DistleGame:
     '''
@@ -30,12 +30,12 @@ class DistleGame:
         self._verbose: bool = verbose
         script_dir = os.path.dirname(__file__)
         file_path = os.path.join(script_dir, dictionary_path)
-        self.dictionary: set[str] = set()
-        with open(file_path, "r") as file:
-            for line in file:
-                self.dictionary.add(line.rstrip())
-        self.rand_word_list: list[str] = list(self.dictionary)
-        self.rand_word_list.sort()
+        # Indexed once here rather than by the player in every game (and from the
+        # dictionary's snapshot, after the first load)
+        self.index: DistleDictionary = DistleDictionary.load(file_path)
+        # Frozen, so that every game can share it with the player rather than copying it
+        self.dictionary: frozenset[str] = frozenset(self.index.words)
+        self.rand_word_list: list[str] = list(self.index.words)
     
     def new_game(self, max_guesses: int, word: Optional[str] = None, rand_ind: Optional[int] = None) -> bool:
         '''
@@ -147,7 +147,7 @@ class DistleGame:
         guess = ""
         
         if not self._ai is None:
-            self._ai.start_new_game(copy.deepcopy(self.dictionary), max_guesses)
+            self._ai.start_new_game(self.dictionary, max_guesses, self.index)
         
         if self._verbose:
             print("=================================")
@@ -0,0 +1,80 @@
+'''
+Offline builder of the opening books of Distle dictionaries: the best first guess
+of each dictionary, and the best second guess after each feedback to it, which a
+DistlePlayer would otherwise search the whole dictionary for at the start of every
+game. Each book is written beside its dictionary's file, keyed by the hash of the
+dictionary's contents, where DistleDictionary.openings finds it.
+
+Run this file to (re)build the books of the repository's dictionaries.
+'''
+from typing import *
+from distle_dictionary import *
+from distle_player import *
+import os
+import time
+
+# The samples that the first guess is chosen with, which are far larger than a
+# player could afford every game, since the book is only built once
+FIRST_GUESS_SAMPLE: int = 200
+FIRST_CANDIDATE_SAMPLE: int = 2000
+
+# The samples that each second guess is chosen with
+SECOND_GUESS_SAMPLE: int = 100
+SECOND_CANDIDATE_SAMPLE: int = 500
+
+
+def build_opening_book(dictionary: "DistleDictionary") -> "OpeningBook":
+    '''
+    Computes the opening book of the given dictionary.
+    
+    Parameters:
+        dictionary (DistleDictionary):
+            The dictionary whose opening guesses are computed
+    
+    Returns:
+        OpeningBook:
+            The first guess of the dictionary, and the second guess after each
+            feedback to it that leaves more than a single candidate
+    '''
+    player: DistlePlayer = DistlePlayer()
+    player.start_new_game(set(dictionary.words), 0)
+    first: str = player.best_guess(dictionary.words, FIRST_GUESS_SAMPLE, FIRST_CANDIDATE_SAMPLE)
+    player.feedback_cache.clear()
+
+    buckets: dict[str, list[str]] = {}
+    for word in dictionary.words:
+        buckets.setdefault("".join(get_transformation_list(first, word)), []).append(word)
+    second: dict[str, str] = {}
+    for key, bucket in buckets.items():
+        if len(bucket) > 1:
+            second[key] = player.best_guess(bucket, SECOND_GUESS_SAMPLE, SECOND_CANDIDATE_SAMPLE)
+    return OpeningBook(dictionary.content_hash(), first, second)
+
+
+def build_opening_book_file(dictionary_path: str) -> "OpeningBook":
+    '''
+    Computes the opening book of the dictionary at the given path, and writes it
+    beside the dictionary's file.
+    
+    Parameters:
+        dictionary_path (str):
+            Path to a dictionary file with new-line separated words
+    
+    Returns:
+        OpeningBook:
+            The book that was written
+    '''
+    with open(dictionary_path, "r") as file:
+        dictionary: DistleDictionary = DistleDictionary((line.rstrip() for line in file), dictionary_path)
+    book: OpeningBook = build_opening_book(dictionary)
+    book.save(dictionary_path + OPENINGS_SUFFIX)
+    return book
+
+
+if __name__ == '__main__':
+    script_dir = os.path.dirname(__file__)
+    for name in ["dictionary6.txt", "dictionary10.txt", "dictionary14.txt"]:
+        start: float = time.time()
+        book: OpeningBook = build_opening_book_file(os.path.join(script_dir, "../dat", name))
+        print("[!] " + name + ": opens with " + book.first + ", then " + str(len(book.second)) +
+              " second guesses (" + str(round(time.time() - start, 1)) + "s)")
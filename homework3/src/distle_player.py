@@ -1,4 +1,34 @@
 from edit_dist_utils import *
+from distle_dictionary import *
+from concurrent.futures import ProcessPoolExecutor
+import math
+import random
+
+# The most remaining candidates that are weighed as guesses, and the most that each
+# guess's feedback is simulated against to estimate its entropy; sampled (the same
+# way every game) when there are more, which keeps each guess fast on any dictionary
+GUESS_SAMPLE: int = 40
+CANDIDATE_SAMPLE: int = 200
+
+# The most (guess, candidate) feedback signatures kept between games, past which
+# the least recently used are evicted, bounding the player's memory
+FEEDBACK_CACHE_LIMIT: int = 1_000_000
+
+# The random number seed of the samples, so that games are reproducible
+SAMPLE_SEED: int = 2130
+
+# The widest ring of Levenshtein distances that the first feedback's candidates are
+# searched for in the dictionary's BK-tree; past it, the tree prunes too little to
+# beat scanning the words of the deduced length
+BK_TREE_MAX_RADIUS: int = 3
+
+# The fewest candidates that are filtered across the worker processes of a player
+# with more than one; smaller sets are filtered faster than they are sent to them
+PARALLEL_MIN_CANDIDATES: int = 4000
+
+# The number of shards that each worker process is given of the candidates being
+# filtered, so that a worker that finishes early can take another's
+SHARDS_PER_WORKER: int = 4
 
 class DistlePlayer:
     '''
@@ -6,7 +36,28 @@ class DistlePlayer:
     the game of Distle with frightening accuracy (hopefully)
     '''
 
-    def start_new_game(self, dictionary: set[str], max_guesses: int) -> None:
+    def __init__(self, workers: int = 1) -> None:
+        '''
+        Constructs a new DistlePlayer, whose cache of feedback signatures is kept
+        across every game it plays.
+        
+        Parameters:
+            workers (int):
+                The number of processes that the first feedback's candidates are
+                filtered across, when the dictionary is indexed; 1 filters them all
+                in this process
+        '''
+        # The transforms (and so the feedback) of each (guess, candidate) pair seen so far
+        self.feedback_cache: TransformCache = TransformCache(FEEDBACK_CACHE_LIMIT)
+        self.workers: int = workers
+        # Started for the first indexed dictionary played, which each worker is sent once
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.pool_hash: Optional[str] = None
+        # The dictionary's index, for the game being played
+        self.index: Optional["DistleDictionary"] = None
+
+    def start_new_game(self, dictionary: AbstractSet[str], max_guesses: int,
+                       index: Optional["DistleDictionary"] = None) -> None:
         '''
         Called at the start of every new game of Distle, and parameterized by
         the dictionary composing all possible words that can be used as guesses,
@@ -17,16 +68,30 @@ class DistlePlayer:
         game, e.g., by saving a copy of the dictionary, etc.
         
         Parameters:
-            dictionary (set[str]):
+            dictionary (AbstractSet[str]):
                 The dictionary of words from which the correct answer AND any
-                possible guesses must be drawn
+                possible guesses must be drawn, which is shared by every game and
+                so is never modified; each round's candidates are a new set instead
             max_guesses (int):
                 The maximum number of guesses that are available to the agent
                 in this game of Distle
+            index (Optional[DistleDictionary]):
+                The same dictionary's words indexed by length, if the DistleGame
+                built one when loading it
         '''
 
         self.guess_number: int = 0
-        self.dict_copy: set[str] = dictionary
+        self.dict_copy: AbstractSet[str] = dictionary
+        self.index = index
+        self.rng: random.Random = random.Random(SAMPLE_SEED)
+        # The first two guesses are looked up rather than searched for, if the dictionary has a book of them
+        self.openings: Optional["OpeningBook"] = None if index is None else index.openings()
+        self.first_transforms: Optional[list[str]] = None
+        if self.workers > 1 and index is not None and self.pool_hash != index.content_hash():
+            self.close()
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                            initargs=(index.words,))
+            self.pool_hash = index.content_hash()
 
         return None
 
@@ -39,12 +104,100 @@ class DistlePlayer:
         [!] You will never call this method yourself, it will be called for you by
         the DistleGame that is running.
         
+        The guess is the remaining candidate whose feedback is expected to split
+        the remaining candidates most evenly, i.e., whose partition of them by
+        feedback has the most entropy, so that the most is learned from it. The
+        first two guesses are instead read from the dictionary's opening book, if
+        it has one (see distle_openings).
+        
         Returns:
             str:
                 The next guessed word from this DistlePlayer
         '''
 
-        return str(list(self.dict_copy)[0])
+        if self.openings is not None:
+            opening: Optional[str] = None
+            if self.guess_number == 0:
+                opening = self.openings.first
+            elif self.guess_number == 1 and self.first_transforms is not None:
+                opening = self.openings.second_guess(self.first_transforms)
+            if opening is not None and opening in self.dict_copy:
+                return opening
+        return self.best_guess(self.dict_copy, GUESS_SAMPLE, CANDIDATE_SAMPLE)
+
+    def best_guess(self, remaining: Iterable[str], guess_sample: int, candidate_sample: int) -> str:
+        '''
+        Returns the candidate whose feedback partitions the candidates with the most
+        entropy, estimated from samples of them when there are too many.
+        
+        Parameters:
+            remaining (Iterable[str]):
+                The candidates that may still be the secret word
+            guess_sample (int):
+                The most candidates that are weighed as guesses
+            candidate_sample (int):
+                The most candidates that each guess's feedback is simulated against
+        
+        Returns:
+            str:
+                The best guess among the candidates
+        '''
+        # Sorted first, so that the samples do not depend on the set's (hash) order
+        candidates: list[str] = sorted(remaining)
+        if len(candidates) <= 2:
+            return candidates[0]
+        guesses: list[str] = candidates if len(candidates) <= guess_sample else \
+            sorted(self.rng.sample(candidates, guess_sample))
+        secrets: list[str] = candidates if len(candidates) <= candidate_sample else \
+            self.rng.sample(candidates, candidate_sample)
+
+        best_guess: str = guesses[0]
+        best_entropy: float = -1.0
+        for guess in guesses:
+            entropy: float = self.feedback_entropy(guess, secrets)
+            if entropy > best_entropy:
+                best_guess, best_entropy = guess, entropy
+        return best_guess
+
+    def feedback_entropy(self, guess: str, secrets: list[str]) -> float:
+        '''
+        Returns the entropy of the partition of the given secret words by the
+        feedback that guessing the given word would receive for each.
+        
+        Parameters:
+            guess (str):
+                The word that would be guessed
+            secrets (list[str]):
+                The (equally likely) secret words
+        
+        Returns:
+            float:
+                The expected information of the feedback, in bits
+        '''
+        partitions: dict[tuple[str, ...], int] = {}
+        for secret in secrets:
+            signature: tuple[str, ...] = () if secret == guess else self.feedback(guess, secret)
+            partitions[signature] = partitions.get(signature, 0) + 1
+        total: int = len(secrets)
+        return math.log2(total) - sum(count * math.log2(count) for count in partitions.values()) / total
+
+    def feedback(self, guess: str, secret: str) -> tuple[str, ...]:
+        '''
+        Returns the transforms that guessing the given word would receive as
+        feedback if the other were the secret, which also give the edit distance
+        (their number); looked up in the player's cache when seen before.
+        
+        Parameters:
+            guess (str):
+                The guessed word
+            secret (str):
+                The secret word
+        
+        Returns:
+            tuple[str, ...]:
+                The top-down transforms from the guess to the secret
+        '''
+        return self.feedback_cache.transforms(guess, secret)
 
     def get_feedback(self, guess: str, edit_distance: int, transforms: list[str]) -> None:
         '''
@@ -68,7 +221,9 @@ class DistlePlayer:
                 get_transformation_list(guess, secret_word)
         '''
 
+        survivors: Optional[set[str]] = None
         if self.guess_number == 0:
+            self.first_transforms = transforms
             word_length: int = len(guess)
             for transform in transforms:
                 if transform == "I":
@@ -76,19 +231,144 @@ class DistlePlayer:
                 if transform == "D":
                     word_length -= 1
 
-            words_of_diff_length: set[str] = set()
-            for word in self.dict_copy:
-                if len(word) != word_length:
-                    words_of_diff_length.add(word)
-            self.dict_copy -= words_of_diff_length
+            # The length deduced from the transforms picks out the candidates directly when
+            # the dictionary is indexed, as does the BK-tree of that length when the secret is
+            # close to the guess; any other length is ruled out before running the DP
+            widest: int = edit_distance + transforms.count("T")
+            if self.index is not None and widest <= BK_TREE_MAX_RADIUS:
+                self.dict_copy = set(self.index.bk_tree(word_length).within(guess, edit_distance, widest))
+            elif self.index is not None:
+                bucket: tuple[str, ...] = self.index.with_length(word_length)
+                # The whole bucket is worth splitting across the worker processes, if there are any
+                if self.pool is not None and len(bucket) >= PARALLEL_MIN_CANDIDATES:
+                    survivors = self.filter_in_parallel(guess, edit_distance, transforms, word_length)
+                else:
+                    survivors = self.filter_candidates(guess, edit_distance, transforms, bucket)
+            else:
+                self.dict_copy = {word for word in self.dict_copy if len(word) == word_length}
 
-        wrong_guesses: set[str] = set()
-        wrong_guesses.add(guess)
-        for word in self.dict_copy:
-            if get_transformation_list(guess, word) != transforms:
-                wrong_guesses.add(word)
-        self.dict_copy -= wrong_guesses
+        if survivors is None:
+            survivors = self.filter_candidates(guess, edit_distance, transforms, self.dict_copy)
+        survivors.discard(guess)
+        self.dict_copy = survivors
 
         self.guess_number += 1
 
         return None
+
+    def filter_candidates(self, guess: str, edit_distance: int, transforms: list[str],
+                          candidates: Iterable[str]) -> set[str]:
+        '''
+        Returns the given candidates that would have received the given feedback to
+        the given guess, had they been the secret word.
+        
+        Parameters:
+            guess (str):
+                The guess that received the feedback
+            edit_distance (int):
+                The edit distance between the guess and the secret word
+            transforms (list[str]):
+                The transforms from the guess to the secret word
+            candidates (Iterable[str]):
+                The words that may be the secret word
+        
+        Returns:
+            set[str]:
+                The candidates consistent with the feedback
+        '''
+        # Checked from cheapest to dearest: no word differing in length by more than the
+        # distance can be at it; every letter of the secret that the guess lacks must have
+        # been brought in by a replacement or insertion, which the letter bags count in a
+        # popcount; and the distance rules out most words before their transforms are computed
+        guess_masks: dict[str, int] = get_char_masks(guess)
+        guess_bag: int = get_letter_bag(guess)
+        introduced: int = transforms.count("R") + transforms.count("I")
+        bags: dict[str, int] = {} if self.index is None else self.index.letter_bags()
+        observed: tuple[str, ...] = tuple(transforms)
+        survivors: set[str] = set()
+        for word in candidates:
+            if abs(len(word) - len(guess)) > edit_distance:
+                continue
+            bag: Optional[int] = bags.get(word)
+            if bag is not None and len(word) - (guess_bag & bag).bit_count() > introduced:
+                continue
+            if bit_parallel_edit_distance(guess, word, guess_masks) == edit_distance and \
+                    self.feedback(guess, word) == observed:
+                survivors.add(word)
+        return survivors
+
+    def filter_in_parallel(self, guess: str, edit_distance: int, transforms: list[str], length: int) -> set[str]:
+        '''
+        Filters the dictionary's words of the given length by the given feedback, as
+        filter_candidates does, split into shards across the player's worker processes.
+        Each worker already holds the dictionary, so only the feedback and the bounds
+        of each shard are sent to it, and each keeps its own cache of feedback.
+        
+        Parameters:
+            guess (str):
+                The guess that received the feedback
+            edit_distance (int):
+                The edit distance between the guess and the secret word
+            transforms (list[str]):
+                The transforms from the guess to the secret word
+            length (int):
+                The length of the secret word
+        
+        Returns:
+            set[str]:
+                The words of that length consistent with the feedback
+        '''
+        assert self.pool is not None and self.index is not None
+        size: int = len(self.index.with_length(length))
+        shards: int = self.workers * SHARDS_PER_WORKER
+        bounds: list[int] = [size * shard // shards for shard in range(shards + 1)]
+        args: list[tuple[str, int, list[str], int, int, int]] = \
+            [(guess, edit_distance, transforms, length, start, stop) for start, stop in zip(bounds, bounds[1:])]
+        survivors: set[str] = set()
+        for shard_survivors in self.pool.map(_filter_in_worker, args):
+            survivors.update(shard_survivors)
+        return survivors
+
+    def close(self) -> None:
+        '''
+        Shuts down the player's worker processes, if it has any; they are started
+        again by the next game that needs them.
+        '''
+        if self.pool is not None:
+            self.pool.shutdown()
+        self.pool = None
+        self.pool_hash = None
+
+
+# Each worker process of a parallel filter keeps the dictionary it was started with,
+# and a player of its own whose feedback cache lasts as long as the worker does
+_worker_index: Optional["DistleDictionary"] = None
+_worker_player: Optional["DistlePlayer"] = None
+
+def _init_worker(words: tuple[str, ...]) -> None:
+    '''
+    Initializes the dictionary and player of a parallel filter's worker process.
+    '''
+    global _worker_index, _worker_player
+    _worker_index = DistleDictionary(words)
+    _worker_player = DistlePlayer()
+    _worker_player.index = _worker_index
+
+def _filter_in_worker(args: tuple[str, int, list[str], int, int, int]) -> list[str]:
+    '''
+    Filters a single shard of the words of one length in a worker process of a parallel filter.
+    
+    Parameters:
+        args (tuple[str, int, list[str], int, int, int]):
+            The guess, edit distance, and transforms of the feedback, the length of the
+            words being filtered, and the bounds of the shard among them.
+    
+    Returns:
+        list[str]:
+            The words of the shard consistent with the feedback.
+    '''
+    guess, edit_distance, transforms, length, start, stop = args
+    if _worker_index is None or _worker_player is None:
+        raise RuntimeError("[X] Worker process was not initialized")
+    shard: tuple[str, ...] = _worker_index.with_length(length)[start:stop]
+    return list(_worker_player.filter_candidates(guess, edit_distance, transforms, shard))
@@ -1,7 +1,11 @@
 import unittest
 import pytest
 import random
+import os
+import json
+import tempfile
 from distle_game import *
+from distle_benchmark import GameResult, BenchmarkStats, percentile, run_benchmark, write_games_csv, append_summary_csv
 import multiprocessing
 from joblib import Parallel, delayed # type: ignore
 
@@ -115,5 +119,219 @@ class DistleTests(unittest.TestCase):
         sim_results = run_game_show("../dat/dictionary14.txt")
         self.assertLessEqual(0.95, self.report_results(sim_results), RATIO_MESSAGE)
 
+    def test_distle_dictionary_t0(self) -> None:
+        index = DistleDictionary(["cat", "at", "dog", "cat", "horse"])
+        self.assertEqual(("at", "cat", "dog", "horse"), index.words)
+        self.assertEqual(("cat", "dog"), index.with_length(3))
+        self.assertEqual((), index.with_length(4))
+        self.assertIn("dog", index)
+        self.assertNotIn("do", index)
+        self.assertEqual(4, len(index))
+        
+    def test_distle_player_length_bucket_t0(self) -> None:
+        words = {"cat", "at", "dog", "cot", "horse", "cart"}
+        for index in [DistleDictionary(words), None]:
+            player = DistlePlayer()
+            player.start_new_game(set(words), MAX_GUESSES, index)
+            # "horse" -> "cot" deletes two letters, so only 3-letter words remain
+            player.get_feedback("horse", edit_distance("horse", "cot"), get_transformation_list("horse", "cot"))
+            self.assertIn("cot", player.dict_copy)
+            self.assertEqual({3}, {len(word) for word in player.dict_copy})
+
+    def test_distle_player_entropy_guess_t0(self) -> None:
+        words = {"cat", "cot", "cut", "dog", "dot", "cog"}
+        player = DistlePlayer()
+        player.start_new_game(set(words), MAX_GUESSES)
+        guess = player.make_guess()
+        self.assertIn(guess, words)
+        # The same candidates always get the same guess, whatever the set's order
+        player.start_new_game(set(sorted(words, reverse=True)), MAX_GUESSES)
+        self.assertEqual(guess, player.make_guess())
+        # Each guess's feedback splits the candidates into as many groups as it can
+        best = max(player.feedback_entropy(word, sorted(words)) for word in sorted(words))
+        self.assertEqual(best, player.feedback_entropy(guess, sorted(words)))
+        
+    def test_distle_player_feedback_cache_t0(self) -> None:
+        player = DistlePlayer()
+        player.start_new_game({"hack", "fkc"}, MAX_GUESSES)
+        self.assertEqual(("T", "R", "D"), player.feedback("hack", "fkc"))
+        self.assertEqual(("T", "R", "D"), player.feedback_cache[("hack", "fkc")])
+        # The cache is kept from one game to the next
+        player.start_new_game({"hack", "fkc"}, MAX_GUESSES)
+        self.assertIn(("hack", "fkc"), player.feedback_cache)
+
+    def test_distle_opening_book_t0(self) -> None:
+        words = ["cat", "cot", "cut", "dog", "dot", "cog"]
+        # The hash is of the words, not the order they were read in
+        self.assertEqual(DistleDictionary(words).content_hash(), DistleDictionary(reversed(words)).content_hash())
+        self.assertNotEqual(DistleDictionary(words).content_hash(), DistleDictionary(words[1:]).content_hash())
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "dictionary.txt")
+            index = DistleDictionary(words, path)
+            self.assertIsNone(index.openings())
+            book = OpeningBook(index.content_hash(), "dog", {"R": "cot"})
+            book.save(path + OPENINGS_SUFFIX)
+            loaded = DistleDictionary(words, path).openings()
+            assert loaded is not None
+            self.assertEqual(("dog", "cot", None), (loaded.first, loaded.second_guess(["R"]), loaded.second_guess([])))
+            # A book for other contents is ignored
+            self.assertIsNone(DistleDictionary(words[1:], path).openings())
+
+    def test_distle_player_opening_book_t0(self) -> None:
+        words = {"cat", "cot", "cut", "dog", "dot", "cog"}
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "dictionary.txt")
+            index = DistleDictionary(words, path)
+            OpeningBook(index.content_hash(), "cut", {"R": "cot"}).save(path + OPENINGS_SUFFIX)
+            player = DistlePlayer()
+            player.start_new_game(set(words), MAX_GUESSES, index)
+            self.assertEqual("cut", player.make_guess())
+            player.get_feedback("cut", 1, ["R"])
+            self.assertEqual("cot", player.make_guess())
+
+    def test_distle_bk_tree_t0(self) -> None:
+        rng = random.Random(2130)
+        words = ["".join(rng.choice("abcd") for _ in range(rng.randint(1, 6))) for _ in range(300)]
+        tree = BKTree(words)
+        self.assertEqual(len(set(words)), len(tree))
+        for query in ["abc", "dddd", "a", "abcdab"]:
+            for low, high in [(0, 0), (1, 2), (2, 4), (0, 10)]:
+                expected = {word for word in words if low <= levenshtein_distance(query, word) <= high}
+                self.assertEqual(expected, set(tree.within(query, low, high)))
+        # A tree read back from its nodes prunes exactly as the original did
+        copy = BKTree.from_json(json.loads(json.dumps(tree.to_json())))
+        self.assertEqual(tree.children, copy.children)
+        self.assertEqual(sorted(tree.within("abc", 1, 2)), sorted(copy.within("abc", 1, 2)))
+
+    def test_distle_bk_tree_file_t0(self) -> None:
+        words = ["cat", "cot", "cut", "dog", "dot", "cog", "at", "horse"]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "dictionary.txt")
+            DistleDictionary(words, path).save_bk_trees()
+            self.assertTrue(os.path.exists(path + BK_TREE_SUFFIX))
+            loaded = DistleDictionary(words, path).bk_tree(3)
+            self.assertEqual(["cat", "cog", "cot", "cut", "dog", "dot"], sorted(loaded.words))
+            # Trees of other contents are rebuilt rather than used
+            self.assertEqual(["cat", "cot"], sorted(DistleDictionary(["cat", "cot"], path).bk_tree(3).words))
+
+    def test_distle_player_bk_tree_t0(self) -> None:
+        words = {"cat", "cot", "cut", "act", "dog", "dot", "cog", "coat", "at"}
+        for guess, secret in [("cat", "cot"), ("cat", "act"), ("cot", "dog"), ("coat", "cut")]:
+            survivors = []
+            for index in [DistleDictionary(words), None]:
+                player = DistlePlayer()
+                player.start_new_game(set(words), MAX_GUESSES, index)
+                player.get_feedback(guess, edit_distance(guess, secret), get_transformation_list(guess, secret))
+                self.assertIn(secret, player.dict_copy)
+                survivors.append(player.dict_copy)
+            self.assertEqual(survivors[0], survivors[1])
+
+    def test_distle_player_parallel_filter_t0(self) -> None:
+        rng = random.Random(2130)
+        words: set[str] = set()
+        while len(words) < PARALLEL_MIN_CANDIDATES:
+            words.add("".join(rng.choice("abcdef") for _ in range(6)))
+        index = DistleDictionary(words)
+        guess, secret = "abcdef", sorted(words)[0]
+        survivors = []
+        for workers in [1, 2]:
+            player = DistlePlayer(workers)
+            player.start_new_game(set(words), MAX_GUESSES, index)
+            player.get_feedback(guess, edit_distance(guess, secret), get_transformation_list(guess, secret))
+            player.close()
+            self.assertIn(secret, player.dict_copy)
+            survivors.append(player.dict_copy)
+        self.assertEqual(survivors[0], survivors[1])
+
+    def test_distle_game_shared_dictionary_t0(self) -> None:
+        player = DistlePlayer()
+        game = DistleGame("../dat/dictionary6.txt", False, player)
+        size = game.get_dictionary_size()
+        for rand_ind in range(3):
+            game.new_game(MAX_GUESSES, rand_ind=rand_ind)
+        # Every game is handed the same dictionary, which none of them may change
+        player.start_new_game(game.dictionary, MAX_GUESSES, game.index)
+        self.assertIs(game.dictionary, player.dict_copy)
+        self.assertEqual(size, len(game.dictionary))
+
+    def test_distle_benchmark_t0(self) -> None:
+        results = [GameResult("cat", True, 2, [1.0, 3.0], [2.0]), GameResult("dog", False, 10, [5.0], [4.0])]
+        stats = BenchmarkStats(results, MAX_GUESSES, 1.0)
+        self.assertEqual(0.5, stats.win_rate())
+        # A loss counts as one more guess than were allowed
+        self.assertEqual(6.5, stats.mean_guesses())
+        self.assertEqual(3.0, percentile(stats.guess_ms, 50))
+        self.assertEqual(5.0, percentile(stats.guess_ms, 100))
+        self.assertEqual(0.0, percentile([], 50))
+
+    def test_distle_benchmark_t1(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            dictionary_path = os.path.join(directory, "dictionary.txt")
+            with open(dictionary_path, "w") as file:
+                file.write("cat\ncot\ncut\ndog\ndot\nhorse\nhouse\n")
+            cache_path = os.path.join(directory, "cache.json")
+            stats = run_benchmark(dictionary_path, "distle_player:DistlePlayer", 3, 2130, 1, MAX_GUESSES, cache_path)
+            self.assertEqual(3, len(stats.results))
+            self.assertEqual(sorted(result.word for result in stats.results), [result.word for result in stats.results])
+            games_path = os.path.join(directory, "games.csv")
+            write_games_csv(games_path, stats.results)
+            summary_path = os.path.join(directory, "summary.csv")
+            for _ in range(2):
+                append_summary_csv(summary_path, stats.summary("dictionary", "distle_player:DistlePlayer"))
+            with open(games_path) as file:
+                self.assertEqual(4, len(file.readlines()))
+            with open(summary_path) as file:
+                self.assertEqual(3, len(file.readlines()))
+            # The run saved its cache, from which a game it played computes no transforms at all
+            self.assertEqual(stats.cache_misses, len(TransformCache.load(cache_path)))
+            stats = run_benchmark(dictionary_path, "distle_player:DistlePlayer", 1, 2130, 1, MAX_GUESSES, cache_path)
+            self.assertEqual(0, stats.cache_misses)
+            self.assertEqual(1.0, stats.cache_hit_rate())
+
+    def test_distle_player_letter_bag_filter_t0(self) -> None:
+        words = {"stop", "stpo", "stoa", "stap", "tsop", "spot"}
+        index = DistleDictionary(words)
+        player = DistlePlayer()
+        player.start_new_game(set(words), MAX_GUESSES, index)
+        # "stop" -> "stpo" is a lone transposition, so no candidate with a letter that "stop"
+        # lacks is left, and those at the same distance are ruled out before their transforms
+        transforms = get_transformation_list("stop", "stpo")
+        survivors = player.filter_candidates("stop", edit_distance("stop", "stpo"), transforms, sorted(words))
+        self.assertEqual({"stpo", "tsop"}, survivors)
+        self.assertNotIn(("stop", "stoa"), player.feedback_cache)
+        self.assertEqual(survivors, DistlePlayer().filter_candidates("stop", 1, transforms, sorted(words)))
+        # Mixed-case and punctuated words keep every letter in their bags
+        words = {"aAx", "aAy", "bbb", "a!x", "Pq0"}
+        player = DistlePlayer()
+        player.start_new_game(set(words), MAX_GUESSES, DistleDictionary(words))
+        for guess, secret in [("aAx", "aAy"), ("a!x", "aAx"), ("Pq0", "a!x")]:
+            transforms = get_transformation_list(guess, secret)
+            survivors = player.filter_candidates(guess, edit_distance(guess, secret), transforms, sorted(words))
+            self.assertIn(secret, survivors)
+
+    def test_distle_dictionary_snapshot_t0(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "dictionary.txt")
+            with open(path, "w") as file:
+                file.write("horse\ncat\nat\ndog\ncat\n")
+            first = DistleDictionary.load(path)
+            self.assertTrue(os.path.exists(path + SNAPSHOT_SUFFIX))
+            # The second load is read from the snapshot, into the same dictionary
+            second = DistleDictionary.load(path)
+            self.assertEqual(("at", "cat", "dog", "horse"), second.words)
+            self.assertEqual(first.by_length, second.by_length)
+            self.assertEqual(path, second.path)
+            # A snapshot of the file as it was is not used once the file changes
+            with open(path, "a") as file:
+                file.write("zebra\n")
+            self.assertEqual(("at", "cat", "dog", "horse", "zebra"), DistleDictionary.load(path).words)
+            self.assertEqual(("horse", "zebra"), DistleDictionary.load(path).with_length(5))
+            # A snapshot that cannot be put in place leaves no partial file behind
+            os.remove(path + SNAPSHOT_SUFFIX)
+            os.mkdir(path + SNAPSHOT_SUFFIX)
+            with self.assertRaises(OSError):
+                first.save_snapshot(path + SNAPSHOT_SUFFIX, os.stat(path))
+            self.assertEqual(["dictionary.txt", "dictionary.txt" + SNAPSHOT_SUFFIX], sorted(os.listdir(directory)))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -1,5 +1,9 @@
 import unittest
 import pytest
+import random
+import os
+import tempfile
+from array import array
 from edit_dist_utils import *
 
 class EditDistUtilTests(unittest.TestCase):
@@ -47,6 +51,49 @@ class EditDistUtilTests(unittest.TestCase):
     def test_edit_dist_t7(self) -> None:
         self.assertEqual(4, edit_distance("aaaabcde", "aaaedbca"))
         
+    # Bit-Parallel Edit Distance Tests
+    # -------------------------------------------------
+    
+    def test_bit_parallel_edit_dist_t0(self) -> None:
+        pairs = [("", ""), ("a", ""), ("", "aa"), ("ab", "abcd"), ("cat", "dog"), ("ab", "ba"), ("bar", "bra"),
+                 ("parisss", "parsimony"), ("wxyyxw", "wyxxyx"), ("abcde", "edbca"), ("aaaabcde", "aaaedbca")]
+        for s0, s1 in pairs:
+            self.assertEqual(get_edit_dist_table(s0, s1)[len(s0)][len(s1)], bit_parallel_edit_distance(s0, s1))
+            self.assertEqual(get_edit_dist_table(s1, s0)[len(s1)][len(s0)], bit_parallel_edit_distance(s1, s0))
+    
+    def test_bit_parallel_edit_dist_t1(self) -> None:
+        rng = random.Random(2130)
+        for _ in range(500):
+            s0 = "".join(rng.choice("abc") for _ in range(rng.randint(0, 8)))
+            s1 = "".join(rng.choice("abc") for _ in range(rng.randint(0, 8)))
+            self.assertEqual(get_edit_dist_table(s0, s1)[len(s0)][len(s1)],
+                             bit_parallel_edit_distance(s0, s1, get_char_masks(s0)))
+        # Past the length of the bit vectors, the rolling rows of the table are used instead
+        self.assertEqual(2, bit_parallel_edit_distance("a" * 70, "a" * 68))
+        
+    def test_flat_edit_dist_table_t0(self) -> None:
+        scratch = array("H")
+        for s0, s1 in [("", ""), ("hack", "fkc"), ("parisss", "parsimony"), ("ab", "ba"), ("abc", "")]:
+            flat = [cell for row in get_edit_dist_table(s0, s1) for cell in row]
+            self.assertEqual(flat, get_flat_edit_dist_table(s0, s1).tolist())
+            # A reused scratch table may be longer than the table it holds
+            self.assertEqual(flat, get_flat_edit_dist_table(s0, s1, scratch)[:len(flat)].tolist())
+            self.assertEqual(flat[-1], rolling_edit_distance(s0, s1))
+    
+    def test_edit_dist_bounded_t0(self) -> None:
+        self.assertEqual(0, edit_distance_bounded("", "", 0))
+        self.assertEqual(1, edit_distance_bounded("ab", "ba", 1))
+        self.assertEqual(5, edit_distance_bounded("parisss", "parsimony", 5))
+        # Distances past the bound are all reported as the bound + 1
+        self.assertEqual(3, edit_distance_bounded("parisss", "parsimony", 2))
+        self.assertEqual(2, edit_distance_bounded("a", "abcd", 1))
+        rng = random.Random(2130)
+        for _ in range(500):
+            s0 = "".join(rng.choice("abc") for _ in range(rng.randint(0, 8)))
+            s1 = "".join(rng.choice("abc") for _ in range(rng.randint(0, 8)))
+            k = rng.randint(0, 5)
+            self.assertEqual(min(edit_distance(s0, s1), k + 1), edit_distance_bounded(s0, s1, k))
+        
     # Transform List Tests
     # -------------------------------------------------
     
@@ -121,5 +168,74 @@ class EditDistUtilTests(unittest.TestCase):
         self.assertEqual(["R", "R", "T"], get_transformation_list(s0, s1))
         self.assertEqual(["R", "R", "T"], get_transformation_list(s1, s0))
         
+    def test_levenshtein_distance_t0(self) -> None:
+        # Transpositions cost two edits rather than one
+        self.assertEqual(2, levenshtein_distance("ab", "ba"))
+        self.assertEqual(1, edit_distance("ab", "ba"))
+        self.assertEqual(3, levenshtein_distance("", "abc"))
+        self.assertEqual(3, levenshtein_distance("kitten", "sitting"))
+        self.assertEqual(5, levenshtein_distance("parisss", "parsimony"))
+        rng = random.Random(2130)
+        for _ in range(300):
+            s0 = "".join(rng.choice("abc") for _ in range(rng.randint(0, 8)))
+            s1 = "".join(rng.choice("abc") for _ in range(rng.randint(0, 8)))
+            distance = levenshtein_distance(s0, s1)
+            transforms = get_transformation_list(s0, s1)
+            self.assertEqual(distance, levenshtein_distance(s1, s0))
+            self.assertTrue(len(transforms) <= distance <= len(transforms) + transforms.count("T"))
+        
+    def test_letter_bag_t0(self) -> None:
+        self.assertEqual(0, get_letter_bag(""))
+        self.assertEqual(get_letter_bag("stop"), get_letter_bag("pots"))
+        # The popcount of two bags' intersection counts their letters in common
+        self.assertEqual(3, (get_letter_bag("banana") & get_letter_bag("nab")).bit_count())
+        self.assertEqual(4, (get_letter_bag("banana") & get_letter_bag("naan")).bit_count())
+        self.assertEqual(0, (get_letter_bag("abc") & get_letter_bag("xyz")).bit_count())
+        # Letters that fold into the same bit are counted as one, so none is lost
+        self.assertEqual(3, get_letter_bag("aA!").bit_count())
+        self.assertEqual(2, (get_letter_bag("aAx") & get_letter_bag("aAy")).bit_count())
+        self.assertEqual(get_letter_bag("0p"), get_letter_bag("p0"))
+        
+    def test_transform_cache_t0(self) -> None:
+        cache = TransformCache(2)
+        self.assertEqual(("T", "R", "D"), cache.transforms("hack", "fkc"))
+        self.assertEqual(("T", "R", "D"), cache.transforms("hack", "fkc"))
+        self.assertEqual((1, 1, 0.5), (cache.hits, cache.misses, cache.hit_rate()))
+        # The least recently used pair is evicted once the cache is full
+        cache.transforms("ab", "ba")
+        cache.transforms("hack", "fkc")
+        cache.transforms("fullness", "fineness")
+        self.assertEqual(2, len(cache))
+        self.assertIn(("hack", "fkc"), cache)
+        self.assertNotIn(("ab", "ba"), cache)
+        
+    def test_transform_cache_t1(self) -> None:
+        cache = TransformCache()
+        for s0, s1 in [("hack", "fkc"), ("ab", "ba"), ("", "abc")]:
+            cache.transforms(s0, s1)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cache.json")
+            cache.save(path)
+            self.assertEqual(cache.entries, TransformCache.load(path).entries)
+            # A smaller cache keeps just the most recently used of the saved pairs
+            self.assertEqual([("ab", "ba"), ("", "abc")], list(TransformCache.load(path, 2).entries))
+        
+    def test_transform_list_with_table_t0(self) -> None:
+        # The table is left intact, so it can be used again
+        s0 = "hack"
+        s1 = "fkc"
+        table = get_edit_dist_table(s0, s1)
+        before = [row[:] for row in table]
+        self.assertEqual(["T", "R", "D"], get_transformation_list_with_table(s0, s1, table))
+        self.assertEqual(before, table)
+        self.assertEqual(["T", "R", "D"], get_transformation_list_with_table(s0, s1, table))
+        
+    def test_transform_list_with_table_t1(self) -> None:
+        # Longer than the recursion limit would have allowed
+        s0 = "a" * 2000
+        s1 = ""
+        self.assertEqual(["D"] * 2000, get_transformation_list(s0, s1))
+        self.assertEqual(["I"] * 2000, get_transformation_list(s1, s0))
+        
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
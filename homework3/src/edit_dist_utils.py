@@ -8,6 +8,15 @@ provide feedback to the DistlePlayer during a game of Distle.
 [!] Feel free to ADD any methods you see fit for use by your DistlePlayer,
 e.g., some form of entropy computation.
 '''
+from typing import *
+from array import array
+from collections import OrderedDict
+import json
+
+# Scratch buffers reused by every call, so that repeated edit distances (as in the
+# Distle filtering loop) allocate nothing once the buffers fit the longest words
+_SCRATCH_TABLE: "array[int]" = array("H")
+_SCRATCH_ROWS: "array[int]" = array("H")
 
 
 def get_edit_dist_table(row_str: str, col_str: str) -> list[list[int]]:
@@ -28,45 +37,106 @@ def get_edit_dist_table(row_str: str, col_str: str) -> list[list[int]]:
             edit_distance(row_str, col_str)
     '''
 
-    table: list[list[int]] = []
-
-    row_str = " " + row_str
-    col_str = " " + col_str
-
-    for r_num, r_str in enumerate(row_str):
-        row: list[int] = []
-        for c_num, c_str in enumerate(col_str):
-            insertion: float = float("inf")
-            deletion: float = float("inf")
-            replacement: float = float("inf")
-            transposition: float = float("inf")
-            if r_num == 0:
-                for num, string in enumerate(col_str):
-                    row.append(num)
-                break
-            if c_num == 0:
-                row.append(r_num)
-                continue
-            if c_num >= 1:
-                insertion = row[c_num - 1] + 1
-            if r_num >= 1:
-                deletion = table[r_num - 1][c_num] + 1
-            if c_num >= 1 and r_num >= 1:
-                if r_str == c_str:
-                    replacement = table[r_num - 1][c_num - 1]
-                else:
-                    replacement = table[r_num - 1][c_num - 1] + 1
-            if r_num >= 2 and c_num >= 2:
-                if r_str == col_str[c_num - 1: c_num] and c_str == row_str[r_num - 1: r_num]:
-                    transposition = table[r_num - 2][c_num - 2] + 1
-            best_transformation: float = min(insertion, deletion, replacement, transposition)
-
-            row.append(int(best_transformation))
-        table.append(row)
+    width: int = len(col_str) + 1
+    flat: "array[int]" = get_flat_edit_dist_table(row_str, col_str)
+    return [flat[r * width: (r + 1) * width].tolist() for r in range(len(row_str) + 1)]
 
+
+def get_flat_edit_dist_table(row_str: str, col_str: str, table: Optional["array[int]"] = None) -> "array[int]":
+    '''
+    Returns the same memoization table as get_edit_dist_table, flattened row by row
+    into a single array of unsigned shorts: the cell of row r and column c is found at
+    index r * (len(col_str) + 1) + c. Only ints are compared along the way.
+    
+    Parameters:
+        row_str (str):
+            The string located along the table's rows
+        col_str (str):
+            The string located along the table's columns
+        table (Optional[array[int]]):
+            A scratch array('H') to fill in (and grow, if it is too small) rather than
+            allocating a new one, when the previous table it held is no longer needed
+    
+    Returns:
+        array[int]:
+            The completed memoization table, which is the given scratch array if any;
+            cells past the table's size are left as they were
+    '''
+    width: int = len(col_str) + 1
+    size: int = (len(row_str) + 1) * width
+    if table is None:
+        table = array("H", bytes(2 * size))
+    elif len(table) < size:
+        table.extend(bytes(2 * (size - len(table))))
+
+    for c in range(width):
+        table[c] = c
+    for r in range(1, len(row_str) + 1):
+        base: int = r * width
+        above: int = base - width
+        r_char: str = row_str[r - 1]
+        # Compared against for transpositions, which need two characters of each string
+        r_before: str = row_str[r - 2] if r >= 2 else ""
+        left: int = r
+        table[base] = r
+        for c in range(1, width):
+            c_char: str = col_str[c - 1]
+            best: int = table[above + c - 1] if r_char == c_char else table[above + c - 1] + 1
+            if table[above + c] + 1 < best:
+                best = table[above + c] + 1
+            if left + 1 < best:
+                best = left + 1
+            if c >= 2 and r_char == col_str[c - 2] and c_char == r_before and table[above - width + c - 2] + 1 < best:
+                best = table[above - width + c - 2] + 1
+            table[base + c] = best
+            left = best
     return table
 
 
+def rolling_edit_distance(s0: str, s1: str) -> int:
+    '''
+    Returns the edit distance between two given strings by the same recurrence as
+    get_flat_edit_dist_table, but keeping only the three rows of the table that a
+    transposition reaches back across, in a scratch buffer shared between calls.
+    
+    Parameters:
+        s0, s1 (str):
+            The strings to compute the edit distance between
+    
+    Returns:
+        int:
+            The minimal number of string manipulations
+    '''
+    width: int = len(s1) + 1
+    rows: "array[int]" = _SCRATCH_ROWS
+    if len(rows) < 3 * width:
+        rows.extend(bytes(2 * (3 * width - len(rows))))
+
+    # Rows r - 2, r - 1, and r take turns at the three offsets of the buffer
+    for c in range(width):
+        rows[c] = c
+    for r in range(1, len(s0) + 1):
+        base: int = (r % 3) * width
+        above: int = ((r - 1) % 3) * width
+        above_two: int = ((r - 2) % 3) * width
+        r_char: str = s0[r - 1]
+        r_before: str = s0[r - 2] if r >= 2 else ""
+        left: int = r
+        rows[base] = r
+        for c in range(1, width):
+            c_char: str = s1[c - 1]
+            best: int = rows[above + c - 1] if r_char == c_char else rows[above + c - 1] + 1
+            if rows[above + c] + 1 < best:
+                best = rows[above + c] + 1
+            if left + 1 < best:
+                best = left + 1
+            if c >= 2 and r_char == s1[c - 2] and c_char == r_before and rows[above_two + c - 2] + 1 < best:
+                best = rows[above_two + c - 2] + 1
+            rows[base + c] = best
+            left = best
+    return rows[(len(s0) % 3) * width + width - 1]
+
+
 def edit_distance(s0: str, s1: str) -> int:
     '''
     Returns the edit distance between two given strings, defined as an
@@ -85,7 +155,223 @@ def edit_distance(s0: str, s1: str) -> int:
             The minimal number of string manipulations
     '''
     if s0 == s1: return 0
-    return get_edit_dist_table(s0, s1)[len(s0)][len(s1)]
+    return bit_parallel_edit_distance(s0, s1)
+
+
+# Longest pattern that the bit-parallel edit distance packs into its bit vectors;
+# words are at most this long, so longer strings fall back to rolling_edit_distance
+MAX_BIT_PARALLEL_LENGTH: int = 64
+
+
+def get_char_masks(pattern: str) -> dict[str, int]:
+    '''
+    Returns the match masks of the given pattern for bit_parallel_edit_distance:
+    for each of its characters, an int with bit i set wherever pattern[i] is that
+    character.
+    
+    Parameters:
+        pattern (str):
+            The string whose characters are masked
+    
+    Returns:
+        dict[str, int]:
+            The match mask of each character in the pattern
+    '''
+    masks: dict[str, int] = {}
+    for index, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | 1 << index
+    return masks
+
+
+# Bits given to each occurrence of a letter in a letter bag; letters are folded into
+# them by the low bits of their code points, so that a-z (and A-Z) each have one
+LETTER_BAG_STRIDE: int = 32
+
+
+def get_letter_bag(word: str) -> int:
+    '''
+    Returns the multiset of the given word's letters as an int, with one bit set for
+    each occurrence of each letter (the bit of the k-th "a" is k strides above that
+    of the first), so that the number of letters that two words have in common is
+    just the popcount of their bags' intersection. Letters that share the low bits
+    of their code points (e.g., "a", "A", and "!") are counted as one letter, which
+    can only overstate what is in common.
+    
+    Parameters:
+        word (str):
+            The word whose letters are bagged
+    
+    Returns:
+        int:
+            The letter bag of the word
+    '''
+    # Counted by the bit a letter folds into, so that letters sharing it take turns
+    occurrences: dict[int, int] = {}
+    bag: int = 0
+    for char in word:
+        folded: int = ord(char) % LETTER_BAG_STRIDE
+        occurrence: int = occurrences.get(folded, 0)
+        occurrences[folded] = occurrence + 1
+        bag |= 1 << (folded + LETTER_BAG_STRIDE * occurrence)
+    return bag
+
+
+def bit_parallel_edit_distance(s0: str, s1: str, masks: Optional[dict[str, int]] = None) -> int:
+    '''
+    Returns the same edit distance as edit_distance, computed by the bit-parallel
+    algorithm of Myers, as extended to transpositions by Hyyro: a whole column of
+    the memoization table is encoded as bit vectors of its vertical deltas, so each
+    character of s1 costs a handful of int operations rather than a row of cells.
+    Only the distance is found, so use the table when the transforms are needed too.
+    
+    Parameters:
+        s0, s1 (str):
+            The strings to compute the edit distance between
+        masks (Optional[dict[str, int]]):
+            The result of get_char_masks(s0), when many strings are compared against
+            the same s0 and it should be computed only once
+    
+    Returns:
+        int:
+            The minimal number of string manipulations
+    '''
+    length: int = len(s0)
+    if length == 0:
+        return len(s1)
+    if length > MAX_BIT_PARALLEL_LENGTH:
+        return rolling_edit_distance(s0, s1)
+    if masks is None:
+        masks = get_char_masks(s0)
+
+    full: int = (1 << length) - 1
+    last: int = 1 << (length - 1)
+    vertical_pos: int = full
+    vertical_neg: int = 0
+    diagonal_zero: int = 0
+    previous_match: int = 0
+    distance: int = length
+    for char in s1:
+        match: int = masks.get(char, 0)
+        transposed: int = ((~diagonal_zero & match) << 1) & previous_match
+        diagonal_zero = (((match & vertical_pos) + vertical_pos) ^ vertical_pos) | match | vertical_neg | transposed
+        horizontal_pos: int = vertical_neg | (~(diagonal_zero | vertical_pos) & full)
+        horizontal_neg: int = diagonal_zero & vertical_pos
+        if horizontal_pos & last:
+            distance += 1
+        elif horizontal_neg & last:
+            distance -= 1
+        horizontal_pos = ((horizontal_pos << 1) | 1) & full
+        horizontal_neg = (horizontal_neg << 1) & full
+        vertical_pos = horizontal_neg | (~(diagonal_zero | horizontal_pos) & full)
+        vertical_neg = horizontal_pos & diagonal_zero
+        previous_match = match
+    return distance
+
+
+def levenshtein_distance(s0: str, s1: str, masks: Optional[dict[str, int]] = None) -> int:
+    '''
+    Returns the Levenshtein distance between two given strings, i.e., their edit
+    distance when transpositions are not allowed (each one costs a deletion and an
+    insertion instead), by the bit-parallel algorithm of Myers. Unlike edit_distance,
+    this is a metric (it satisfies the triangle inequality), so it can index words
+    in a metric tree; a pair of words at edit distance d whose transforms include t
+    transpositions is at a Levenshtein distance between d and d + t.
+    
+    Parameters:
+        s0, s1 (str):
+            The strings to compute the Levenshtein distance between
+        masks (Optional[dict[str, int]]):
+            The result of get_char_masks(s0), when many strings are compared against
+            the same s0 and it should be computed only once
+    
+    Returns:
+        int:
+            The minimal number of insertions, deletions, and replacements
+    '''
+    length: int = len(s0)
+    if length == 0:
+        return len(s1)
+    if masks is None:
+        masks = get_char_masks(s0)
+
+    # Python's ints have no fixed width, so unlike bit_parallel_edit_distance there
+    # is no length past which this must fall back to the table
+    full: int = (1 << length) - 1
+    last: int = 1 << (length - 1)
+    vertical_pos: int = full
+    vertical_neg: int = 0
+    distance: int = length
+    for char in s1:
+        match: int = masks.get(char, 0)
+        diagonal_zero: int = (((match & vertical_pos) + vertical_pos) ^ vertical_pos) | match | vertical_neg
+        horizontal_pos: int = vertical_neg | (~(diagonal_zero | vertical_pos) & full)
+        horizontal_neg: int = diagonal_zero & vertical_pos
+        if horizontal_pos & last:
+            distance += 1
+        elif horizontal_neg & last:
+            distance -= 1
+        horizontal_pos = ((horizontal_pos << 1) | 1) & full
+        horizontal_neg = (horizontal_neg << 1) & full
+        vertical_pos = horizontal_neg | (~(diagonal_zero | horizontal_pos) & full)
+        vertical_neg = horizontal_pos & diagonal_zero
+    return distance
+
+
+def edit_distance_bounded(s0: str, s1: str, k: int) -> int:
+    '''
+    Returns the edit distance between two given strings if it is at most k, and k + 1
+    otherwise. Only the diagonal band of the memoization table within k of its main
+    diagonal is filled in (any path that leaves it costs more than k), and the rows
+    stop as soon as every cell of one exceeds k, so strings that are far apart are
+    rejected after just a few rows.
+    
+    Parameters:
+        s0, s1 (str):
+            The strings to compute the edit distance between
+        k (int):
+            The largest edit distance of interest
+    
+    Returns:
+        int:
+            The minimal number of string manipulations, or k + 1 if that exceeds k
+    '''
+    rows: int = len(s0)
+    cols: int = len(s1)
+    over: int = k + 1
+    if abs(rows - cols) > k:
+        return over
+
+    # Three rolling rows suffice, as a transposition reaches back two rows
+    before: list[int] = [over] * (cols + 1)
+    previous: list[int] = [min(col, over) for col in range(cols + 1)]
+    current: list[int] = [over] * (cols + 1)
+    for row in range(1, rows + 1):
+        row_char: str = s0[row - 1]
+        low: int = max(1, row - k)
+        high: int = min(cols, row + k)
+        current[0] = min(row, over)
+        # The cell left of the band may hold a value from an earlier row
+        current[low - 1] = min(row, over) if low == 1 else over
+        row_minimum: int = current[low - 1]
+        for col in range(low, high + 1):
+            col_char: str = s1[col - 1]
+            best: int = previous[col - 1] if row_char == col_char else previous[col - 1] + 1
+            if previous[col] + 1 < best:
+                best = previous[col] + 1
+            if current[col - 1] + 1 < best:
+                best = current[col - 1] + 1
+            if row >= 2 and col >= 2 and row_char == s1[col - 2] and col_char == s0[row - 2] and \
+                    before[col - 2] + 1 < best:
+                best = before[col - 2] + 1
+            if best > over:
+                best = over
+            current[col] = best
+            if best < row_minimum:
+                row_minimum = best
+        if row_minimum > k:
+            return over
+        before, previous, current = previous, current, before
+    return previous[cols]
 
 
 def get_transformation_list(s0: str, s1: str) -> list[str]:
@@ -119,7 +405,9 @@ def get_transformation_list(s0: str, s1: str) -> list[str]:
             The sequence of top-down manipulations required to turn s0 into s1
     '''
 
-    return get_transformation_list_with_table(s0, s1, get_edit_dist_table(s0, s1))
+    table: "array[int]" = get_flat_edit_dist_table(s0, s1, _SCRATCH_TABLE)
+    width: int = len(s1) + 1
+    return _backtrace(s0, s1, lambda r, c: table[r * width + c])
 
 
 def get_transformation_list_with_table(s0: str, s1: str, table: list[list[int]]) -> list[str]:
@@ -132,7 +420,8 @@ def get_transformation_list_with_table(s0: str, s1: str, table: list[list[int]])
     and is being used by multiple methods.
     
     [!] MUST use the already-solved memoization table and must NOT recompute it.
-    [!] MUST be implemented recursively (i.e., in top-down fashion)
+    [!] Walks the table top-down, from its largest subproblem, without modifying it,
+        so the table may be reused afterwards
 
     1. "R" = Replacement
     2. "T" = Transposition
@@ -140,84 +429,164 @@ def get_transformation_list_with_table(s0: str, s1: str, table: list[list[int]])
     4. "D" = Deletion
     '''
 
-    transformation_list: list[str] = []
+    return _backtrace(s0, s1, lambda r, c: table[r][c])
 
-    return recursion(s0, s1, table, transformation_list)[3]
 
-#>>[NO] I'd recommend a better name than recursion for this method, something that is somewhat descriptive of the functionality
-def recursion(string0: str, string1: str, table: list[list[int]], transformation_list: list[str]) -> tuple[
-    str, str, list[list[int]], list[str]]:
+def _backtrace(s0: str, s1: str, cell: Callable[[int, int], int]) -> list[str]:
     '''
-    Recursive function associated with get_transformation_list_with_table. Implements retrieving the transformations
-    with top-down structure.
+    Walks a completed memoization table top-down, from its largest subproblem, to
+    the transformation list of get_transformation_list; the table is read through
+    the given function, so that it works on both the nested and flat tables.
+    
     Parameters:
-        string0 (str):
-            The string located along the table's rows
-        string1 (str):
-            The string located along the table's columns
-        table (list[list[int]])
-            The memoization table that has already been computed.
-        transformation_list (list[str])
-            The transformation list after recursing through the memoization table top-down. The transformations
-            necessary to transform string0 to string1.
-
+        s0, s1 (str):
+            Start and destination strings for the transformation
+        cell (Callable[[int, int], int]):
+            Returns the table's value at the given row and column
+    
     Returns:
-        list[tuple[str, str, list[list[int]], list[str]]:
-            Completed memoization table for the computation of the
-            edit_distance(row_str, col_str)
+        list[str]:
+            The sequence of top-down manipulations required to turn s0 into s1
     '''
+    transformation_list: list[str] = []
+    row: int = len(s0)
+    col: int = len(s1)
 
-    if table[len(string0)][len(string1)] == 0:
-        return string0, string1, table, transformation_list
-
-    insertion: float = float("inf")
-    deletion: float = float("inf")
-    replacement: float = float("inf")
-    transposition: float = float("inf")
-
-    if len(string0) >= 1:
-        deletion = table[len(string0) - 1][len(string1)] + 1
-    if len(string1) >= 1:
-        insertion = table[len(string0)][len(string1) - 1] + 1
-    if len(string0) >= 1 and len(string1) >= 1:
-        if string0[-1] == string1[-1]:
-            replacement = table[len(string0) - 1][len(string1) - 1]
-        else:
-            replacement = table[len(string0) - 1][len(string1) - 1] + 1
-    if len(string0) >= 2 and len(string1) >= 2:
-        if string0[-1] == string1[-2:-1] and string1[-1] == string0[-2:-1]:
-            transposition = table[len(string0) - 2][len(string1) - 2] + 1
-
-    minimum: float = min(deletion, insertion, replacement, transposition)
-
-    if minimum == replacement:
-        if string0[-1] != string1[-1]:
-            transformation_list.append("R")
-        string0 = string0[:-1]
-        string1 = string1[:-1]
-        table.pop()
-        for row in table:
-            row.pop()
-    elif minimum == transposition:
-        string0 = string0[:-2]
-        string1 = string1[:-2]
-        table.pop()
-        table.pop()
-        for row in table:
-            row.pop()
-            row.pop()
-        transformation_list.append("T")
-    elif minimum == insertion:
-        string1 = string1[:-1]
-        for row in table:
-            row.pop()
-        transformation_list.append("I")
-    else:
-        string0 = string0[:-1]
-        table.pop()
+    while cell(row, col) != 0:
+        current: int = cell(row, col)
+        # Each candidate is only taken if it accounts for the current cell, in the
+        # tiebreaking order of replacements, transpositions, insertions, then deletions
+        if row >= 1 and col >= 1:
+            replaced: bool = s0[row - 1] != s1[col - 1]
+            if cell(row - 1, col - 1) + (1 if replaced else 0) == current:
+                if replaced:
+                    transformation_list.append("R")
+                row -= 1
+                col -= 1
+                continue
+        if row >= 2 and col >= 2 and s0[row - 1] == s1[col - 2] and s1[col - 1] == s0[row - 2] and \
+                cell(row - 2, col - 2) + 1 == current:
+            transformation_list.append("T")
+            row -= 2
+            col -= 2
+            continue
+        if col >= 1 and cell(row, col - 1) + 1 == current:
+            transformation_list.append("I")
+            col -= 1
+            continue
         transformation_list.append("D")
+        row -= 1
+
+    return transformation_list
+
+
+# The most word pairs whose transforms a TransformCache keeps by default
+TRANSFORM_CACHE_CAPACITY: int = 1_000_000
+
+
+class TransformCache:
+    '''
+    Bounded cache of the transformation lists of word pairs, which evicts the least
+    recently used pair once it is full. Keeps count of its hits and misses, and can
+    be saved to and loaded from disk, so that work is reused between games and
+    between runs that compare the same words (e.g., against the same opening guess).
+    '''
+
+    def __init__(self, capacity: int = TRANSFORM_CACHE_CAPACITY) -> None:
+        '''
+        Parameters:
+            capacity (int):
+                The most word pairs kept at once
+        '''
+        self.capacity: int = capacity
+        self.entries: OrderedDict[tuple[str, str], tuple[str, ...]] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def transforms(self, s0: str, s1: str) -> tuple[str, ...]:
+        '''
+        Returns the transformation list of the given strings, computed by
+        get_transformation_list only if the pair is not already cached.
+        
+        Parameters:
+            s0, s1 (str):
+                The strings to transform between
+        
+        Returns:
+            tuple[str, ...]:
+                The top-down transforms from s0 to s1
+        '''
+        key: tuple[str, str] = (s0, s1)
+        entry: Optional[tuple[str, ...]] = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry
+        self.misses += 1
+        entry = tuple(get_transformation_list(s0, s1))
+        self.entries[key] = entry
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+        return entry
+
+    def hit_rate(self) -> float:
+        '''
+        Returns:
+            float:
+                The fraction of lookups that were answered from the cache, or 0.0
+                if there were none
+        '''
+        lookups: int = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self) -> None:
+        '''
+        Empties the cache, though its counts of hits and misses are kept.
+        '''
+        self.entries.clear()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.entries
+
+    def __getitem__(self, key: tuple[str, str]) -> tuple[str, ...]:
+        return self.entries[key]
+
+    def save(self, path: str) -> None:
+        '''
+        Writes the cached pairs to the given path as JSON, least recently used first.
+        
+        Parameters:
+            path (str):
+                The path of the file to write
+        '''
+        with open(path, "w") as file:
+            json.dump([[s0, s1, "".join(entry)] for (s0, s1), entry in self.entries.items()], file)
+
+    @staticmethod
+    def load(path: str, capacity: int = TRANSFORM_CACHE_CAPACITY) -> "TransformCache":
+        '''
+        Reads the pairs previously written by save into a new cache.
+        
+        Parameters:
+            path (str):
+                The path of the file to read
+            capacity (int):
+                The most word pairs kept by the new cache, which keeps the most
+                recently used of the file's pairs if it cannot hold them all
+        
+        Returns:
+            TransformCache:
+                The cache of the file's pairs
+        '''
+        cache: TransformCache = TransformCache(capacity)
+        with open(path, "r") as file:
+            for s0, s1, transforms in json.load(file)[-capacity:]:
+                cache.entries[(str(s0), str(s1))] = tuple(transforms)
+        return cache
 
-    return recursion(string0, string1, table, transformation_list)
 
 # ===================================================
 # >>> [NO] Summary